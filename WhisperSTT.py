@@ -1,315 +1,715 @@
-import streamlit as st
-import whisper
-import os
-import time
-import tempfile
-import subprocess
-
-# Function to extract audio from video using ffmpeg
-def extract_audio_from_video(video_path, audio_path):
-    """Extract audio from video file using ffmpeg"""
-    try:
-        # Using ffmpeg to extract audio
-        command = [
-            "ffmpeg", 
-            "-i", video_path, 
-            "-q:a", "0", 
-            "-map", "a", 
-            "-vn", 
-            audio_path,
-            "-y"  # Overwrite output file if it exists
-        ]
-        
-        # Run the command
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        stdout, stderr = process.communicate()
-        
-        # Check if the conversion was successful
-        if process.returncode != 0:
-            st.error(f"Error extracting audio: {stderr.decode()}")
-            return False
-        
-        return True
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-        return False
-
-# App configuration
-st.set_page_config(
-    page_title="Whisper Speech-to-Text",
-    page_icon="🎤",
-    layout="wide"
-)
-
-st.title("🎤 Speech-to-Text with Whisper")
-st.write("Convert speech to text using OpenAI's Whisper model")
-
-# Create tabs for different features
-tab1, tab2, tab3 = st.tabs(["Sample Audio", "Upload Audio", "Upload Video"])
-
-with tab1:
-    st.header("Sample Audio Transcription")
-    
-    # Path to the sample audio
-    audio_path = r"C:\Users\Asus\Downloads\beta stage\Data\weather\whisper.cpp-master\samples\jfk.mp3"
-    
-    # Display audio player if file exists
-    if os.path.exists(audio_path):
-        st.audio(audio_path)
-    else:
-        st.error(f"Sample audio not found at: {audio_path}")
-    
-    # Model selection
-    model_size = st.selectbox(
-        "Select Whisper Model Size",
-        ["tiny", "base", "small", "medium", "large"],
-        index=1  # Default to "base"
-    )
-    
-    if st.button("Transcribe Sample Audio"):
-        if not os.path.exists(audio_path):
-            st.error("Sample audio file not found.")
-        else:
-            # Show loading spinner while processing
-            with st.spinner(f"Transcribing with {model_size} model... This may take a moment."):
-                start_time = time.time()
-                
-                # Load the selected model
-                model = whisper.load_model(model_size)
-                
-                # Run transcription
-                result = model.transcribe(audio_path)
-                
-                # Calculate elapsed time
-                elapsed = time.time() - start_time
-                
-                # Display success message
-                st.success(f"✅ Transcription completed in {elapsed:.2f} seconds")
-                
-                # Display the complete transcription
-                st.subheader("Transcription")
-                st.text_area("Full Text", result["text"], height=150)
-                
-                # Display segments with timestamps
-                st.subheader("Segments with Timestamps")
-                for segment in result["segments"]:
-                    st.markdown(f"**[{segment['start']:.2f}s - {segment['end']:.2f}s]** {segment['text']}")
-
-with tab2:
-    st.header("Upload Your Audio")
-    
-    uploaded_file = st.file_uploader("Choose an audio file", type=["mp3", "wav", "m4a", "ogg"])
-    
-    if uploaded_file is not None:
-        # Display uploaded audio
-        st.audio(uploaded_file)
-        
-        # Save the uploaded file temporarily
-        with open("temp_audio.mp3", "wb") as f:
-            f.write(uploaded_file.getvalue())
-        
-        # Model selection
-        model_size = st.selectbox(
-            "Select Whisper Model Size",
-            ["tiny", "base", "small", "medium", "large"],
-            index=1,  # Default to "base"
-            key="upload_model_size"
-        )
-        
-        if st.button("Transcribe Uploaded Audio"):
-            # Show loading spinner while processing
-            with st.spinner(f"Transcribing with {model_size} model... This may take a moment."):
-                start_time = time.time()
-                
-                # Load the selected model
-                model = whisper.load_model(model_size)
-                
-                # Run transcription
-                result = model.transcribe("temp_audio.mp3")
-                
-                # Calculate elapsed time
-                elapsed = time.time() - start_time
-                
-                # Display success message
-                st.success(f"✅ Transcription completed in {elapsed:.2f} seconds")
-                
-                # Display the complete transcription
-                st.subheader("Transcription")
-                transcription = result["text"]
-                st.text_area("Full Text", transcription, height=150)
-                
-                # Add download button
-                st.download_button(
-                    "Download Transcription",
-                    transcription,
-                    file_name="transcription.txt",
-                    mime="text/plain"
-                )
-                
-                # Display segments with timestamps
-                st.subheader("Segments with Timestamps")
-                for segment in result["segments"]:
-                    st.markdown(f"**[{segment['start']:.2f}s - {segment['end']:.2f}s]** {segment['text']}")
-            
-            # Clean up the temporary file
-            if os.path.exists("temp_audio.mp3"):
-                os.remove("temp_audio.mp3")
-
-with tab3:
-    st.header("Video to Text")
-    st.write("Upload a video file to extract audio and transcribe it")
-    
-    # File uploader for videos
-    video_file = st.file_uploader("Choose a video file", type=["mp4", "avi", "mov", "mkv", "wmv"])
-    
-    if video_file is not None:
-        # Display the uploaded video
-        st.video(video_file)
-        
-        # Create temporary files for processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(video_file.name)[1]) as video_temp:
-            video_temp.write(video_file.getvalue())
-            video_temp_path = video_temp.name
-        
-        audio_temp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
-        
-        # Model selection
-        model_size = st.selectbox(
-            "Select Whisper Model Size",
-            ["tiny", "base", "small", "medium", "large"],
-            index=1,  # Default to "base"
-            key="video_model_size"
-        )
-        
-        # Process button
-        if st.button("Extract Audio and Transcribe"):
-            try:
-                # Step 1: Extract audio from video
-                with st.spinner("Extracting audio from video..."):
-                    if not extract_audio_from_video(video_temp_path, audio_temp_path):
-                        st.error("Failed to extract audio from the video file.")
-                        # Clean up temporary files
-                        os.unlink(video_temp_path)
-                        if os.path.exists(audio_temp_path):
-                            os.unlink(audio_temp_path)
-                        st.stop()
-                    
-                    st.success("Audio extracted successfully!")
-                
-                # Step 2: Transcribe the audio
-                with st.spinner(f"Transcribing with {model_size} model... This may take a moment."):
-                    start_time = time.time()
-                    
-                    # Load the selected model
-                    model = whisper.load_model(model_size)
-                    
-                    # Run transcription
-                    result = model.transcribe(audio_temp_path)
-                    
-                    # Calculate elapsed time
-                    elapsed = time.time() - start_time
-                    
-                    # Display success message
-                    st.success(f"✅ Transcription completed in {elapsed:.2f} seconds")
-                
-                # Display the complete transcription
-                st.subheader("Transcription")
-                transcription = result["text"]
-                st.text_area("Full Text", transcription, height=150)
-                
-                # Add download button
-                st.download_button(
-                    "Download Transcription",
-                    transcription,
-                    file_name=f"{os.path.splitext(video_file.name)[0]}_transcription.txt",
-                    mime="text/plain"
-                )
-                
-                # Display segments with timestamps
-                st.subheader("Segments with Timestamps")
-                for segment in result["segments"]:
-                    st.markdown(f"**[{segment['start']:.2f}s - {segment['end']:.2f}s]** {segment['text']}")
-                
-                # Option to download the extracted audio
-                with open(audio_temp_path, "rb") as audio_file:
-                    audio_bytes = audio_file.read()
-                    
-                st.audio(audio_bytes, format="audio/mp3")
-                st.download_button(
-                    "Download Extracted Audio",
-                    audio_bytes,
-                    file_name=f"{os.path.splitext(video_file.name)[0]}_audio.mp3",
-                    mime="audio/mp3"
-                )
-                
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
-            finally:
-                # Clean up temporary files
-                if os.path.exists(video_temp_path):
-                    os.unlink(video_temp_path)
-                if os.path.exists(audio_temp_path):
-                    os.unlink(audio_temp_path)
-
-# Function to extract audio from video using ffmpeg
-def extract_audio_from_video(video_path, audio_path):
-    """Extract audio from video file using ffmpeg"""
-    try:
-        # Using ffmpeg to extract audio
-        command = [
-            "ffmpeg", 
-            "-i", video_path, 
-            "-q:a", "0", 
-            "-map", "a", 
-            "-vn", 
-            audio_path,
-            "-y"  # Overwrite output file if it exists
-        ]
-        
-        # Run the command
-        process = subprocess.Popen(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        stdout, stderr = process.communicate()
-        
-        # Check if the conversion was successful
-        if process.returncode != 0:
-            st.error(f"Error extracting audio: {stderr.decode()}")
-            return False
-        
-        return True
-    except Exception as e:
-        st.error(f"Error: {str(e)}")
-        return False
-
-# Add information in the sidebar
-st.sidebar.title("About")
-st.sidebar.info(
-    """
-    This app uses [OpenAI's Whisper](https://github.com/openai/whisper) model for speech recognition.
-    
-    Whisper is an automatic speech recognition (ASR) system trained on 680,000 hours of multilingual and multitask supervised data.
-    
-    For video files, the app extracts audio using FFmpeg before processing with Whisper.
-    """
-)
-
-# Display model information
-st.sidebar.title("Model Information")
-st.sidebar.markdown(
-    """
-    | Model | Parameters | English-only | Multilingual | Required VRAM | Relative speed |
-    |-------|------------|--------------|--------------|---------------|----------------|
-    | tiny  | 39 M       | tiny.en      | tiny         | ~1 GB         | ~32x           |
-    | base  | 74 M       | base.en      | base         | ~1 GB         | ~16x           |
-    | small | 244 M      | small.en     | small        | ~2 GB         | ~6x            |
-    | medium| 769 M      | medium.en    | medium       | ~5 GB         | ~2x            |
-    | large | 1550 M     | N/A          | large        | ~10 GB        | 1x             |
-    """
-)
\ No newline at end of file
+import streamlit as st
+import math
+import os
+import queue
+import time
+
+from audio_io import AudioDecodeError, pcm_to_wav_bytes, probe_duration
+from exporters import export_text
+from job_queue import CANCELLED, DONE, FAILED, QUEUED, QueueFullError, job_queue
+from metrics import stage_metrics, start_metrics_server
+from model_registry import registry
+from model_selector import DEFAULT_LATENCY_SLO_SECONDS, choose_model, estimate_seconds, rtf_tracker, start_calibration
+from result_cache import hash_audio, language_cache, result_cache, transcription_key
+from stt_engines import DEFAULT_ENGINE, ENGINES
+from streaming_stt import StreamingTranscriber
+from transcription import long_audio_workers, merge_two_pass, run_transcription_job, run_two_pass_job
+
+# How often a page with a running job checks back for progress
+POLL_SECONDS = 1.0
+# Model used for the instant first pass in two-pass mode
+DRAFT_MODEL_SIZE = "tiny"
+# Model choices; "auto" picks the most accurate size that fits the latency budget
+MODEL_OPTIONS = ["auto", "tiny", "base", "small", "medium", "large"]
+# Segments per table page; bounds what is sent to the browser however long the transcript is
+SEGMENTS_PAGE_SIZE = 100
+# Download formats: (label, MIME type)
+EXPORT_FORMATS = {
+    "txt": ("Plain text (.txt)", "text/plain"),
+    "srt": ("SRT subtitles (.srt)", "application/x-subrip"),
+    "vtt": ("WebVTT subtitles (.vtt)", "text/vtt"),
+    "json": ("JSON with timestamps (.json)", "application/json"),
+}
+# Spoken-language choices; auto-detection runs once per file and is then cached
+LANGUAGES = {
+    "": "Auto-detect",
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "nl": "Dutch",
+    "pl": "Polish",
+    "ru": "Russian",
+    "tr": "Turkish",
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "zh": "Chinese",
+    "ja": "Japanese",
+    "ko": "Korean",
+}
+
+# Function to display a finished transcription with download and segments
+def show_transcription(result, tab_key, file_name="transcription.txt"):
+    """Show full text, a download button and timestamped segments"""
+    start_time = time.perf_counter()
+    st.subheader("Transcription")
+    transcription = result["text"]
+    st.text_area("Full Text", transcription, height=150, key=f"{tab_key}_full_text")
+    
+    # Add download button (only the selected format is rendered on each rerun)
+    export_format = st.selectbox(
+        "Download format",
+        list(EXPORT_FORMATS),
+        format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+        key=f"{tab_key}_export_format"
+    )
+    st.download_button(
+        "Download Transcription",
+        export_text(result, export_format),
+        file_name=f"{os.path.splitext(file_name)[0]}.{export_format}",
+        mime=EXPORT_FORMATS[export_format][1],
+        key=f"{tab_key}_download_text"
+    )
+    
+    # Display segments with timestamps
+    st.subheader("Segments with Timestamps")
+    show_segments(result["segments"], tab_key)
+    stage_metrics.observe("stt", "render", time.perf_counter() - start_time)
+
+# Function to display segments as one filtered, paginated table
+def show_segments(segments, tab_key):
+    """Show one page of segments in a single table, with time-range filtering and text search"""
+    if not segments:
+        return
+    # pandas is only needed once there is a result to show
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "Start (s)": [segment["start"] for segment in segments],
+        "End (s)": [segment["end"] for segment in segments],
+        "Text": [segment["text"].strip() for segment in segments],
+    })
+    if any(segment.get("draft") for segment in segments):
+        # Two-pass mode: mark the segments the refine pass has not reached yet
+        frame["Draft"] = [bool(segment.get("draft")) for segment in segments]
+    
+    total_seconds = max(float(frame["End (s)"].iloc[-1]), 1.0)
+    search_column, range_column = st.columns([2, 3])
+    query = search_column.text_input("Search segments", key=f"{tab_key}_segment_search")
+    # The range lives in session state under a stable key so it survives polls while a job runs;
+    # a range that reaches the end keeps following it as the transcript grows
+    range_key = f"{tab_key}_segment_range"
+    previous_total = st.session_state.get(f"{range_key}_total")
+    range_start, range_end = st.session_state.get(range_key, (0.0, total_seconds))
+    if previous_total is None or range_end >= previous_total:
+        range_end = total_seconds
+    st.session_state[range_key] = (min(range_start, total_seconds), min(range_end, total_seconds))
+    st.session_state[f"{range_key}_total"] = total_seconds
+    time_range = range_column.slider("Time range (s)", 0.0, total_seconds, key=range_key)
+    
+    mask = (frame["End (s)"] >= time_range[0]) & (frame["Start (s)"] <= time_range[1])
+    if query:
+        mask &= frame["Text"].str.contains(query, case=False, regex=False)
+    matches = frame[mask]
+    
+    pages = max(1, math.ceil(len(matches) / SEGMENTS_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page_key = f"{tab_key}_segment_page"
+        # A narrower filter can leave the remembered page past the end
+        st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+        page = st.number_input("Page", min_value=1, max_value=pages, key=page_key)
+    st.caption(f"{len(matches)} of {len(frame)} segments | page {page} of {pages}")
+    st.dataframe(
+        matches.iloc[(page - 1) * SEGMENTS_PAGE_SIZE:page * SEGMENTS_PAGE_SIZE],
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Start (s)": st.column_config.NumberColumn(format="%.2f"),
+            "End (s)": st.column_config.NumberColumn(format="%.2f"),
+            "Text": st.column_config.TextColumn(width="large"),
+        }
+    )
+
+# Function to show where a finished job spent its time
+def show_stage_timings(job):
+    """Show per-stage durations and where the language came from"""
+    timings = job.artifacts.get("timings")
+    if timings:
+        st.caption("Stages: " + " · ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+    
+    language = job.result.get("language")
+    source = job.artifacts.get("language_source")
+    if source == "cached":
+        saved = language_cache.stats()["avg_detect_s"]
+        st.caption(f"Language: {language} (from cache, skipped ~{saved:.2f}s of detection)")
+    elif source == "selected":
+        st.caption(f"Language: {language} (selected, detection skipped)")
+    elif language:
+        st.caption(f"Language: {language} (detected)")
+
+# Function to get (and remember) the duration of an upload without decoding it on every rerun
+def audio_duration(source, cache_key):
+    """Duration in seconds of a file path or bytes, or None if it cannot be read"""
+    durations = st.session_state.setdefault("_durations", {})
+    if cache_key not in durations:
+        try:
+            durations[cache_key] = probe_duration(source)
+        except AudioDecodeError:
+            durations[cache_key] = None
+    return durations[cache_key]
+
+# Function to predict how long a transcription will take before it is queued
+def plan_transcription(tab_key, duration, model_size, engine, two_pass=False):
+    """Show the predicted completion time; returns the model size to use ("auto" resolved) and its run time"""
+    if model_size == "auto":
+        # Latency budget for the whole job, queue wait included
+        slo_seconds = st.number_input(
+            "Latency budget (seconds)",
+            min_value=10,
+            value=int(DEFAULT_LATENCY_SLO_SECONDS),
+            step=10,
+            key=f"{tab_key}_slo"
+        )
+    if duration is None:
+        if model_size == "auto":
+            st.caption("Could not read the audio duration; auto mode uses the base model.")
+            return "base", None
+        return model_size, None
+    
+    wait_seconds = job_queue.estimate_wait()
+    if model_size == "auto":
+        model_size, _ = choose_model(duration, engine, slo_seconds, wait_seconds)
+    run_seconds = estimate_seconds(duration, model_size, engine)
+    if two_pass and model_size != DRAFT_MODEL_SIZE:
+        run_seconds += estimate_seconds(duration, DRAFT_MODEL_SIZE, engine)
+    _, measured = rtf_tracker.rtf(engine, model_size)
+    
+    st.info(
+        f"⏱️ Expected to finish in about {wait_seconds + run_seconds:.0f}s with **{model_size}** "
+        f"for {duration:.0f}s of audio (queue wait ~{wait_seconds:.0f}s"
+        f"{'' if measured else ', speed extrapolated'})"
+    )
+    return model_size, run_seconds
+
+# Function to start a background transcription (or reuse a cached one) for a tab
+def start_transcription(tab_key, file_bytes, model_size, engine, long_audio_mode=False, keep_audio=False,
+                        two_pass=False, vad=False, language=None, estimated_seconds=None):
+    """Queue a transcription job and remember its id in session state"""
+    st.session_state.pop(f"{tab_key}_cached", None)
+    st.session_state.pop(f"{tab_key}_job", None)
+    
+    # Reuse an earlier transcription of the same audio and settings
+    start_time = time.time()
+    # Hashing the uploaded bytes and looking them up is the "upload" stage
+    with stage_metrics.time("stt", "upload"):
+        audio_hash = hash_audio(file_bytes)
+        cache_key = transcription_key(audio_hash, model_size, engine, long_audio_mode, vad, language)
+        result = result_cache.get(cache_key)
+    if result is not None:
+        st.session_state[f"{tab_key}_cached"] = (result, time.time() - start_time)
+        return
+    
+    try:
+        if two_pass and not long_audio_mode and model_size != DRAFT_MODEL_SIZE:
+            # Fast draft first, then the selected model refines it segment by segment
+            job = job_queue.submit(
+                run_two_pass_job,
+                file_bytes,
+                model_size,
+                draft_size=DRAFT_MODEL_SIZE,
+                engine=engine,
+                cache_key=cache_key,
+                keep_audio=keep_audio,
+                vad=vad,
+                language=language,
+                audio_hash=audio_hash,
+                estimated_seconds=estimated_seconds,
+                description=f"{tab_key} ({engine} {DRAFT_MODEL_SIZE} -> {model_size})"
+            )
+        else:
+            job = job_queue.submit(
+                run_transcription_job,
+                file_bytes,
+                model_size,
+                engine=engine,
+                long_audio=long_audio_mode,
+                cache_key=cache_key,
+                keep_audio=keep_audio,
+                vad=vad,
+                language=language,
+                audio_hash=audio_hash,
+                estimated_seconds=estimated_seconds,
+                # A long-audio job fans out to several worker processes
+                slots=long_audio_workers(model_size, engine) if long_audio_mode else 1,
+                description=f"{tab_key} ({engine} {model_size})"
+            )
+    except QueueFullError as e:
+        st.warning(f"The server is busy: {e}")
+        return
+    st.session_state[f"{tab_key}_job"] = job.id
+
+# Function to display the state of a tab's transcription job
+def show_job(tab_key, file_name="transcription.txt"):
+    """Show progress, partial segments or the final result; returns the job if any"""
+    cached = st.session_state.get(f"{tab_key}_cached")
+    if cached is not None:
+        result, lookup_seconds = cached
+        st.success(f"⚡ Loaded cached transcription in {lookup_seconds * 1000:.0f} ms")
+        show_transcription(result, tab_key, file_name)
+        return None
+    
+    job_id = st.session_state.get(f"{tab_key}_job")
+    if job_id is None:
+        return None
+    job = job_queue.get(job_id)
+    if job is None:
+        st.info("This transcription has expired. Please run it again.")
+        st.session_state.pop(f"{tab_key}_job", None)
+        return None
+    
+    if job.status == DONE:
+        elapsed = job.finished_at - job.started_at
+        waited = job.started_at - job.submitted_at
+        st.success(f"✅ Transcription completed in {elapsed:.2f} seconds (waited {waited:.1f}s in queue)")
+        show_stage_timings(job)
+        show_transcription(job.result, tab_key, file_name)
+        return job
+    if job.status == FAILED:
+        st.error(f"An error occurred: {job.error}")
+        return job
+    if job.status == CANCELLED:
+        st.warning("Transcription cancelled.")
+        return job
+    
+    # Still queued or running: show where we are and poll again at the end of the script
+    if job.status == QUEUED:
+        st.info(f"Waiting for a free worker ({job_queue.position(job_id)} job(s) ahead)...")
+    else:
+        progress = job.progress
+        duration = progress.get("duration")
+        if "processed" in progress and duration:
+            # Audio seconds processed vs. total, and how fast we are going
+            st.progress(min(progress["processed"] / duration, 1.0))
+            caption = (
+                f"{progress['stage'].capitalize()} with {progress['model']}: "
+                f"processed {progress['processed']:.0f}s of {duration:.0f}s audio "
+                f"| elapsed {progress['elapsed']:.1f}s | realtime factor {progress['realtime_factor']:.2f}"
+            )
+            if "silence_removed" in progress:
+                caption += f" | skipped {progress['silence_removed']:.0f}s of silence"
+            st.caption(caption)
+        else:
+            st.info(f"{progress.get('stage', 'starting').capitalize()}...")
+        
+        # In two-pass mode refined segments replace the draft as they complete
+        segments = list(job.segments)
+        if "draft_segments" in job.artifacts:
+            segments = merge_two_pass(segments, list(job.artifacts["draft_segments"]))
+        show_segments(segments, f"{tab_key}_partial")
+    if st.button("Cancel", key=f"{tab_key}_cancel"):
+        job_queue.cancel(job_id)
+    st.session_state["_poll_jobs"] = True
+    return job
+
+# App configuration
+st.set_page_config(
+    page_title="Whisper Speech-to-Text",
+    page_icon="🎤",
+    layout="wide"
+)
+
+st.title("🎤 Speech-to-Text with Whisper")
+st.write("Convert speech to text using OpenAI's Whisper model")
+
+# Set by show_job when some job is still running, so the page refreshes itself
+st.session_state["_poll_jobs"] = False
+
+# Measure model speeds on this host once per process (feeds the "auto" model choice)
+start_calibration()
+
+# Serve stage timings on METRICS_PORT when it is set (once per process)
+start_metrics_server()
+
+# Create tabs for different features
+tab1, tab2, tab3, tab4 = st.tabs(["Sample Audio", "Upload Audio", "Upload Video", "Live Microphone"])
+
+with tab1:
+    st.header("Sample Audio Transcription")
+    
+    # Path to the sample audio
+    audio_path = r"C:\Users\Asus\Downloads\beta stage\Data\weather\whisper.cpp-master\samples\jfk.mp3"
+    
+    # Display audio player if file exists
+    if os.path.exists(audio_path):
+        st.audio(audio_path)
+    else:
+        st.error(f"Sample audio not found at: {audio_path}")
+    
+    # Model selection
+    model_size = st.selectbox(
+        "Select Whisper Model Size",
+        MODEL_OPTIONS,
+        index=2  # Default to "base"
+    )
+    
+    # Inference engine (whisper.cpp is much faster on CPU-only servers)
+    engine = st.selectbox(
+        "Select Engine",
+        list(ENGINES),
+        index=list(ENGINES).index(DEFAULT_ENGINE),
+        format_func=lambda name: ENGINES[name].label
+    )
+    
+    # Pinning the language skips detection (otherwise it is detected once per file)
+    language = st.selectbox(
+        "Spoken Language",
+        list(LANGUAGES),
+        format_func=LANGUAGES.get
+    )
+    
+    # Predicted completion time (and the model "auto" settles on)
+    sample_duration = audio_duration(audio_path, audio_path) if os.path.exists(audio_path) else None
+    model_size, estimated_seconds = plan_transcription("sample", sample_duration, model_size, engine)
+    
+    if st.button("Transcribe Sample Audio"):
+        if not os.path.exists(audio_path):
+            st.error("Sample audio file not found.")
+        else:
+            # Queue the work; the result is shown below as soon as it is ready
+            with open(audio_path, "rb") as f:
+                start_transcription(
+                    "sample", f.read(), model_size, engine, language=language or None,
+                    estimated_seconds=estimated_seconds
+                )
+    
+    show_job("sample")
+
+with tab2:
+    st.header("Upload Your Audio")
+    
+    uploaded_file = st.file_uploader("Choose an audio file", type=["mp3", "wav", "m4a", "ogg"])
+    
+    if uploaded_file is not None:
+        # Display uploaded audio
+        st.audio(uploaded_file)
+        
+        # Model selection
+        model_size = st.selectbox(
+            "Select Whisper Model Size",
+            MODEL_OPTIONS,
+            index=2,  # Default to "base"
+            key="upload_model_size"
+        )
+        
+        # Inference engine (whisper.cpp is much faster on CPU-only servers)
+        engine = st.selectbox(
+            "Select Engine",
+            list(ENGINES),
+            index=list(ENGINES).index(DEFAULT_ENGINE),
+            format_func=lambda name: ENGINES[name].label,
+            key="upload_engine"
+        )
+        
+        # Pinning the language skips detection (otherwise it is detected once per file)
+        language = st.selectbox(
+            "Spoken Language",
+            list(LANGUAGES),
+            format_func=LANGUAGES.get,
+            key="upload_language"
+        )
+        
+        # Long recordings are split at silences and decoded on all cores
+        long_audio_mode = st.checkbox(
+            "Long audio mode (split into chunks and decode in parallel)",
+            key="upload_long_audio"
+        )
+        
+        # Quick draft first, then the selected model refines it in the background
+        two_pass_mode = st.checkbox(
+            f"Two-pass mode (instant {DRAFT_MODEL_SIZE} draft, refined with the selected model)",
+            disabled=long_audio_mode or model_size == DRAFT_MODEL_SIZE,
+            key="upload_two_pass"
+        )
+        
+        # Collapse long pauses before decoding; timestamps still refer to the original audio
+        vad_mode = st.checkbox(
+            "Skip silence (voice activity detection before decoding)",
+            key="upload_vad"
+        )
+        
+        # Predicted completion time (and the model "auto" settles on)
+        upload_duration = audio_duration(uploaded_file.getvalue(), (uploaded_file.name, uploaded_file.size))
+        model_size, estimated_seconds = plan_transcription(
+            "upload", upload_duration, model_size, engine, two_pass=two_pass_mode and not long_audio_mode
+        )
+        
+        if st.button("Transcribe Uploaded Audio"):
+            # Queue the work; the upload is decoded to PCM in memory by the worker
+            start_transcription(
+                "upload", uploaded_file.getvalue(), model_size, engine, long_audio_mode, two_pass=two_pass_mode,
+                vad=vad_mode, language=language or None, estimated_seconds=estimated_seconds
+            )
+        
+        show_job("upload")
+
+with tab3:
+    st.header("Video to Text")
+    st.write("Upload a video file to extract audio and transcribe it")
+    
+    # File uploader for videos
+    video_file = st.file_uploader("Choose a video file", type=["mp4", "avi", "mov", "mkv", "wmv"])
+    
+    if video_file is not None:
+        # Display the uploaded video
+        st.video(video_file)
+        
+        # Model selection
+        model_size = st.selectbox(
+            "Select Whisper Model Size",
+            MODEL_OPTIONS,
+            index=2,  # Default to "base"
+            key="video_model_size"
+        )
+        
+        # Inference engine (whisper.cpp is much faster on CPU-only servers)
+        engine = st.selectbox(
+            "Select Engine",
+            list(ENGINES),
+            index=list(ENGINES).index(DEFAULT_ENGINE),
+            format_func=lambda name: ENGINES[name].label,
+            key="video_engine"
+        )
+        
+        # Pinning the language skips detection (otherwise it is detected once per file)
+        language = st.selectbox(
+            "Spoken Language",
+            list(LANGUAGES),
+            format_func=LANGUAGES.get,
+            key="video_language"
+        )
+        
+        # Long recordings are split at silences and decoded on all cores
+        long_audio_mode = st.checkbox(
+            "Long audio mode (split into chunks and decode in parallel)",
+            key="video_long_audio"
+        )
+        
+        # Quick draft first, then the selected model refines it in the background
+        two_pass_mode = st.checkbox(
+            f"Two-pass mode (instant {DRAFT_MODEL_SIZE} draft, refined with the selected model)",
+            disabled=long_audio_mode or model_size == DRAFT_MODEL_SIZE,
+            key="video_two_pass"
+        )
+        
+        # Collapse long pauses before decoding; timestamps still refer to the original audio
+        vad_mode = st.checkbox(
+            "Skip silence (voice activity detection before decoding)",
+            key="video_vad"
+        )
+        
+        video_stem = os.path.splitext(video_file.name)[0]
+        
+        # Predicted completion time (and the model "auto" settles on)
+        video_duration = audio_duration(video_file.getvalue(), (video_file.name, video_file.size))
+        model_size, estimated_seconds = plan_transcription(
+            "video", video_duration, model_size, engine, two_pass=two_pass_mode and not long_audio_mode
+        )
+        
+        # Process button
+        if st.button("Extract Audio and Transcribe"):
+            # The worker extracts the audio straight to 16 kHz PCM in memory, then transcribes
+            start_transcription(
+                "video", video_file.getvalue(), model_size, engine, long_audio_mode, keep_audio=True,
+                two_pass=two_pass_mode, vad=vad_mode, language=language or None,
+                estimated_seconds=estimated_seconds
+            )
+        
+        job = show_job("video", file_name=f"{video_stem}_transcription.txt")
+        
+        # Option to download the extracted audio (packed from the decoded PCM, no re-encode)
+        if job is not None and job.status == DONE and "audio" in job.artifacts:
+            audio_bytes = pcm_to_wav_bytes(job.artifacts["audio"])
+            st.audio(audio_bytes, format="audio/wav")
+            st.download_button(
+                "Download Extracted Audio",
+                audio_bytes,
+                file_name=f"{video_stem}_audio.wav",
+                mime="audio/wav"
+            )
+
+with tab4:
+    st.header("Live Microphone Transcription")
+    st.write("Speak into your microphone and watch the text appear while you talk")
+    
+    # Small models keep up with real time on CPU
+    live_model_size = st.selectbox(
+        "Select Whisper Model Size",
+        ["tiny", "base", "small"],
+        index=0,
+        key="live_model_size"
+    )
+    
+    # Auto-detect reuses the language detected in this session's previous recording
+    live_language = st.selectbox(
+        "Spoken Language",
+        list(LANGUAGES),
+        format_func=LANGUAGES.get,
+        key="live_language"
+    )
+    
+    try:
+        import av
+        from streamlit_webrtc import WebRtcMode, webrtc_streamer
+    except ImportError:
+        webrtc_streamer = None
+    
+    if webrtc_streamer is None:
+        st.info(
+            "Install `streamlit-webrtc` to enable live microphone input. "
+            "Streaming can also be tested offline with `python streaming_stt.py recording.wav`."
+        )
+    else:
+        webrtc_ctx = webrtc_streamer(
+            key="live_stt",
+            mode=WebRtcMode.SENDONLY,
+            audio_receiver_size=256,
+            media_stream_constraints={"audio": True, "video": False}
+        )
+        
+        transcriber = st.session_state.get("live_transcriber")
+        if webrtc_ctx.state.playing:
+            # A new transcriber per recording (or when the model changes)
+            if transcriber is None or transcriber.model_size != live_model_size or transcriber.finished:
+                pinned_language = live_language or st.session_state.get("live_detected_language")
+                transcriber = StreamingTranscriber(live_model_size, engine=DEFAULT_ENGINE, language=pinned_language)
+                st.session_state["live_transcriber"] = transcriber
+            # Browsers send 48 kHz stereo; Whisper wants 16 kHz mono
+            resampler = av.AudioResampler(format="s16", layout="mono", rate=16000)
+            live_text = st.empty()
+            live_stats = st.empty()
+            
+            while webrtc_ctx.state.playing:
+                try:
+                    audio_frames = webrtc_ctx.audio_receiver.get_frames(timeout=1)
+                except queue.Empty:
+                    continue
+                for audio_frame in audio_frames:
+                    for resampled in resampler.resample(audio_frame):
+                        samples = resampled.to_ndarray().reshape(-1).astype("float32") / 32768.0
+                        transcriber.feed(samples)
+                
+                live_text.markdown(f"{transcriber.text} ▌")
+                if transcriber.final_latencies:
+                    live_stats.caption(f"Latest finalized-text latency: {transcriber.final_latencies[-1]:.2f}s")
+        elif transcriber is not None:
+            # Recording stopped: finalize the remaining audio once and show the transcript
+            if not transcriber.finished:
+                transcriber.flush()
+                if transcriber.language and not live_language:
+                    st.session_state["live_detected_language"] = transcriber.language
+            st.text_area("Live Transcript", transcriber.text, height=150, key="live_full_text")
+
+# Add information in the sidebar
+st.sidebar.title("About")
+st.sidebar.info(
+    """
+    This app uses [OpenAI's Whisper](https://github.com/openai/whisper) model for speech recognition.
+    
+    Whisper is an automatic speech recognition (ASR) system trained on 680,000 hours of multilingual and multitask supervised data.
+    
+    For video files, the app extracts audio using FFmpeg before processing with Whisper.
+    """
+)
+
+# Display shared model cache counters
+st.sidebar.title("Model Cache")
+cache_stats = registry.stats()
+st.sidebar.markdown(
+    f"""
+    - Loaded: {", ".join(cache_stats["models"]) or "none"}
+    - RAM used: {cache_stats["ram_used_mb"]:.0f} / {cache_stats["ram_budget_mb"]} MB
+    - Hits: {cache_stats["hits"]} | Misses: {cache_stats["misses"]} | Evictions: {cache_stats["evictions"]}
+    - Total load time: {cache_stats["load_seconds_total"]:.2f} s
+    """
+)
+
+# Display transcription result cache counters
+st.sidebar.title("Result Cache")
+result_stats = result_cache.stats()
+st.sidebar.markdown(
+    f"""
+    - Hits: {result_stats["hits"]} | Misses: {result_stats["misses"]} (avg hit {result_stats["avg_hit_ms"]:.1f} ms)
+    - Disk used: {result_stats["disk_used_mb"]:.1f} / {result_stats["max_mb"]} MB
+    - Evictions: {result_stats["evictions"]}
+    """
+)
+
+# Display language detection cache counters
+st.sidebar.title("Language Cache")
+language_stats = language_cache.stats()
+st.sidebar.markdown(
+    f"""
+    - Hits: {language_stats["hits"]} | Misses: {language_stats["misses"]}
+    - Avg detection: {language_stats["avg_detect_s"]:.2f} s | Saved: {language_stats["saved_s"]:.1f} s
+    """
+)
+
+# Display measured model speeds on this host
+st.sidebar.title("Model Speed")
+speed_profile = rtf_tracker.stats()
+if speed_profile:
+    st.sidebar.markdown("\n".join(
+        f"- {name}: {entry['rtf']:.2f}s per audio second ({entry['runs']} run(s))"
+        for name, entry in sorted(speed_profile.items())
+    ))
+elif rtf_tracker.calibration_error is None:
+    st.sidebar.caption("Calibrating...")
+if rtf_tracker.calibration_error is not None:
+    st.sidebar.caption(f"Calibration failed, using estimated speeds: {rtf_tracker.calibration_error}")
+
+# Display where the time goes, stage by stage
+st.sidebar.title("Stage Timings")
+stage_report = stage_metrics.snapshot()
+if stage_report:
+    st.sidebar.markdown("\n".join(
+        f"- {service} {stage}: {entry['count']}x, mean {entry['mean']:.2f}s, p95 {entry['p95']:.2f}s"
+        for service, stages in stage_report.items()
+        for stage, entry in stages.items()
+    ))
+    st.sidebar.download_button(
+        "Download metrics (JSON)", stage_metrics.to_json(), file_name="stage_metrics.json", mime="application/json"
+    )
+else:
+    st.sidebar.caption("Nothing measured yet.")
+
+# Display model information
+st.sidebar.title("Model Information")
+st.sidebar.markdown(
+    """
+    | Model | Parameters | English-only | Multilingual | Required VRAM | Relative speed |
+    |-------|------------|--------------|--------------|---------------|----------------|
+    | tiny  | 39 M       | tiny.en      | tiny         | ~1 GB         | ~32x           |
+    | base  | 74 M       | base.en      | base         | ~1 GB         | ~16x           |
+    | small | 244 M      | small.en     | small        | ~2 GB         | ~6x            |
+    | medium| 769 M      | medium.en    | medium       | ~5 GB         | ~2x            |
+    | large | 1550 M     | N/A          | large        | ~10 GB        | 1x             |
+    """
+)
+# Display background job queue load
+st.sidebar.title("Job Queue")
+queue_stats = job_queue.stats()
+st.sidebar.markdown(
+    f"""
+    - Running: {queue_stats["running"]} / {queue_stats["workers"]} workers
+    - Waiting: {queue_stats["queued"]} (max {queue_stats["max_queued"]})
+    - Rejected: {queue_stats["rejected"]}
+    """
+)
+
+# Keep polling while any of this session's jobs is still in progress
+if st.session_state["_poll_jobs"]:
+    time.sleep(POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,121 @@
+"""In-memory audio decoding with ffmpeg (no intermediate files or MP3 re-encoding)."""
+import io
+import os
+import subprocess
+import tempfile
+import wave
+
+import numpy as np
+
+from metrics import stage_metrics
+
+# Whisper expects 16 kHz mono float32 samples in [-1, 1]
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(RuntimeError):
+    """Raised when ffmpeg cannot decode the input."""
+
+
+def _run_ffmpeg(input_arg, data, sample_rate):
+    """Runs ffmpeg and returns raw float32 PCM from its stdout."""
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads", "0",
+        "-i", input_arg,
+        "-vn",  # Ignore any video stream
+        "-f", "f32le",
+        "-acodec", "pcm_f32le",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    try:
+        process = subprocess.run(command, input=data, capture_output=True)
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg was not found on PATH")
+    if process.returncode != 0:
+        raise AudioDecodeError(process.stderr.decode(errors="replace").strip())
+    return process.stdout
+
+
+def decode_audio(source, sample_rate=SAMPLE_RATE):
+    """Decodes a file path or raw file bytes (audio or video) to mono float32 PCM.
+
+    Bytes are piped through ffmpeg's stdin. Containers that need a seekable input
+    (e.g. MP4/MOV with the index at the end) fall back to a private temporary file.
+    """
+    with stage_metrics.time("stt", "ffmpeg"):
+        if isinstance(source, (str, os.PathLike)):
+            pcm = _run_ffmpeg(os.fspath(source), None, sample_rate)
+        else:
+            data = bytes(source)
+            try:
+                pcm = _run_ffmpeg("pipe:0", data, sample_rate)
+            except AudioDecodeError:
+                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+                    temp_file.write(data)
+                    temp_path = temp_file.name
+                try:
+                    pcm = _run_ffmpeg(temp_path, None, sample_rate)
+                finally:
+                    os.unlink(temp_path)
+        # ffmpeg already produced float32; copy once so torch gets a writable array
+    return np.frombuffer(pcm, dtype=np.float32).copy()
+
+
+def _run_ffprobe(input_arg, data):
+    """Returns the container duration in seconds reported by ffprobe, or None."""
+    command = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        input_arg,
+    ]
+    try:
+        process = subprocess.run(command, input=data, capture_output=True)
+    except FileNotFoundError:
+        raise AudioDecodeError("ffprobe was not found on PATH")
+    try:
+        return float(process.stdout.decode().strip())
+    except ValueError:
+        # "N/A" when the duration cannot be read (e.g. from a pipe)
+        return None
+
+
+def probe_duration(source):
+    """Returns the duration of a file path or raw file bytes in seconds without decoding it.
+
+    Falls back to a full decode when the container does not state its duration.
+    """
+    with stage_metrics.time("stt", "ffprobe"):
+        if isinstance(source, (str, os.PathLike)):
+            duration = _run_ffprobe(os.fspath(source), None)
+        else:
+            data = bytes(source)
+            duration = _run_ffprobe("pipe:0", data)
+            if duration is None:
+                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+                    temp_file.write(data)
+                    temp_path = temp_file.name
+                try:
+                    duration = _run_ffprobe(temp_path, None)
+                finally:
+                    os.unlink(temp_path)
+    if duration is None:
+        duration = len(decode_audio(source)) / SAMPLE_RATE
+    return duration
+
+
+def pcm_to_wav_bytes(audio, sample_rate=SAMPLE_RATE):
+    """Packs float32 PCM into a 16-bit WAV file in memory (for playback/download)."""
+    samples = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
@@ -0,0 +1,289 @@
+"""Headless batch transcription of directories or manifest files.
+
+Example:
+    python batch_transcribe.py recordings/ --output-dir transcripts --model base --workers 4
+    python batch_transcribe.py --manifest nightly.txt --output-dir transcripts --formats txt,srt
+    python batch_transcribe.py recordings/ --output-dir transcripts --metrics batch_metrics.json
+
+Completed items are appended to a journal in the output directory, so re-running the
+same command after a crash skips everything that already finished (a run with another
+model, engine, format set or options redoes them).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from audio_io import SAMPLE_RATE, decode_audio
+from exporters import WRITERS, ExportFiles
+from metrics import stage_metrics
+from result_cache import hash_audio, language_cache, result_cache, transcription_key
+from stt_engines import DEFAULT_ENGINE, ENGINES
+from transcription import detect_language, iter_transcribe, limit_torch_threads
+from vad import remap_segments, trim_silence
+
+# Audio and video types accepted by the Streamlit pages
+MEDIA_EXTENSIONS = {
+    ".mp3", ".wav", ".m4a", ".ogg", ".flac",
+    ".mp4", ".avi", ".mov", ".mkv", ".wmv",
+}
+JOURNAL_NAME = ".batch_journal.jsonl"
+
+
+def collect_items(inputs, manifest=None):
+    """Returns (source_path, output_stem) pairs from directories, files and a manifest."""
+    items = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, _, files in os.walk(entry):
+                for name in sorted(files):
+                    if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                        path = os.path.join(root, name)
+                        # Mirror the input tree in the output directory
+                        stem = os.path.splitext(os.path.relpath(path, entry))[0]
+                        items.append((path, stem))
+        elif os.path.isfile(entry):
+            items.append((entry, os.path.splitext(os.path.basename(entry))[0]))
+        else:
+            print(f"Skipping missing input: {entry}", file=sys.stderr)
+
+    if manifest:
+        # One path per line; blank lines and # comments are ignored
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                path = line if os.path.isabs(line) else os.path.join(base_dir, line)
+                stem = os.path.splitext(os.path.relpath(path, base_dir))[0]
+                if stem.startswith(".."):
+                    stem = os.path.splitext(os.path.basename(path))[0]
+                items.append((path, stem))
+    return items
+
+
+def _item_id(path, settings=""):
+    """Identifies an input by path, size and modification time plus the run `settings`.
+
+    A re-run with another model, engine or output format therefore does not skip the file.
+    """
+    info = os.stat(path)
+    return f"{os.path.abspath(path)}|{info.st_size}|{int(info.st_mtime)}|{settings}"
+
+
+def load_journal(output_dir):
+    """Returns the ids of items completed by earlier runs."""
+    done = set()
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["id"])
+                except (ValueError, KeyError):
+                    # A crash can leave a truncated last line
+                    continue
+    return done
+
+
+def process_item(path, output_stem, output_dir, model_size, engine, formats, decode_options, vad=False):
+    """Transcribes one file in a worker process and writes the requested outputs.
+
+    Returns (audio_seconds, wall_seconds, stage_seconds, language_cached).
+    """
+    start_time = time.perf_counter()
+    timings = {}
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+
+    audio = decode_audio(file_bytes)
+    duration = len(audio) / SAMPLE_RATE
+    timings["decoding"] = time.perf_counter() - start_time
+
+    target = os.path.join(output_dir, output_stem)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    audio_hash = hash_audio(file_bytes)
+    cache_key = transcription_key(audio_hash, model_size, engine, vad=vad, **decode_options)
+    result = result_cache.get(cache_key)
+    language_cached = False
+    if result is not None:
+        for fmt in formats:
+            WRITERS[fmt](result, f"{target}.{fmt}")
+    else:
+        remap = None
+        if vad:
+            stage_start = time.perf_counter()
+            audio, remap = trim_silence(audio)
+            timings["silence removal"] = time.perf_counter() - stage_start
+
+        options = dict(decode_options)
+        if not options.get("language"):
+            # Re-runs (e.g. with another model) find the language in the cache
+            stage_start = time.perf_counter()
+            language, _, language_cached = detect_language(audio, model_size, engine, audio_hash)
+            timings["language detection"] = time.perf_counter() - stage_start
+            if language:
+                options["language"] = language
+
+        # Outputs are written window by window instead of from one big result at the end
+        stage_start = time.perf_counter()
+        exports = ExportFiles(target, formats)
+        segments = []
+        language = options.get("language")
+        try:
+            for update in iter_transcribe(audio, model_size, engine, **options):
+                new_segments = update["segments"]
+                if remap is not None:
+                    new_segments = remap_segments(new_segments, remap)
+                exports.add(new_segments)
+                segments.extend(new_segments)
+                language = update["language"]
+            exports.finish(language)
+        except BaseException:
+            exports.abort()
+            raise
+        timings["transcribing"] = time.perf_counter() - stage_start
+
+        if not options.get("language") and language:
+            language_cache.put(audio_hash, language)
+        result_cache.put(cache_key, {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language,
+        })
+    return duration, time.perf_counter() - start_time, timings, language_cached
+
+
+def run_batch(items, output_dir, model_size="base", workers=1, formats=("txt",), decode_options=None,
+              engine=DEFAULT_ENGINE, vad=False):
+    """Processes items through a bounded worker pool and returns a summary dict."""
+    decode_options = decode_options or {}
+    os.makedirs(output_dir, exist_ok=True)
+    done = load_journal(output_dir)
+    settings = json.dumps(
+        {"model": model_size, "engine": engine, "formats": sorted(formats), "vad": vad, "options": decode_options},
+        sort_keys=True,
+    )
+
+    pending = []
+    skipped = 0
+    for path, stem in items:
+        try:
+            item_id = _item_id(path, settings)
+        except OSError as e:
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+            continue
+        if item_id in done:
+            skipped += 1
+        else:
+            pending.append((path, stem, item_id))
+
+    summary = {
+        "completed": 0, "failed": 0, "skipped": skipped, "audio_seconds": 0.0,
+        "stage_seconds": {}, "languages_cached": 0,
+    }
+    start_time = time.perf_counter()
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    journal = open(os.path.join(output_dir, JOURNAL_NAME), "a", encoding="utf-8")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=limit_torch_threads,
+        initargs=(torch_threads,),
+    ) as pool:
+        in_flight = {}
+        queue = iter(pending)
+        # Keep at most two items per worker queued so huge manifests stay cheap
+        while True:
+            while len(in_flight) < workers * 2:
+                item = next(queue, None)
+                if item is None:
+                    break
+                path, stem, item_id = item
+                future = pool.submit(
+                    process_item, path, stem, output_dir, model_size, engine, formats, decode_options, vad
+                )
+                in_flight[future] = (path, item_id)
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                path, item_id = in_flight.pop(future)
+                try:
+                    duration, elapsed, timings, language_cached = future.result()
+                except Exception as e:
+                    summary["failed"] += 1
+                    print(f"FAILED {path}: {e}", file=sys.stderr)
+                    continue
+                summary["completed"] += 1
+                summary["audio_seconds"] += duration
+                summary["languages_cached"] += language_cached
+                for stage, seconds in timings.items():
+                    summary["stage_seconds"][stage] = summary["stage_seconds"].get(stage, 0.0) + seconds
+                    # Workers are separate processes, so their per-item timings are collected here
+                    stage_metrics.observe("batch", stage, seconds)
+                stage_metrics.observe("batch", "item", elapsed)
+                journal.write(json.dumps({"id": item_id, "audio_seconds": duration}) + "\n")
+                journal.flush()
+                print(f"done {path} ({duration:.1f}s audio in {elapsed:.1f}s)")
+    journal.close()
+
+    wall_seconds = time.perf_counter() - start_time
+    summary["wall_seconds"] = wall_seconds
+    # Audio hours transcribed per wall-clock hour
+    summary["throughput"] = summary["audio_seconds"] / wall_seconds if wall_seconds else 0.0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe audio/video files in bulk with Whisper.")
+    parser.add_argument("inputs", nargs="*", help="Files or directories to transcribe")
+    parser.add_argument("--manifest", help="Text file listing one input path per line")
+    parser.add_argument("--output-dir", required=True, help="Where TXT/JSON/SRT/VTT outputs are written")
+    parser.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"])
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=sorted(ENGINES))
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--formats", default="txt,json,srt", help="Comma-separated subset of txt,json,srt,vtt")
+    parser.add_argument("--language", help="Language code, skips language detection")
+    parser.add_argument("--vad", action="store_true", help="Skip silent stretches before decoding")
+    parser.add_argument("--metrics", help="Write per-stage latency histograms to this JSON file")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        parser.error(f"Unknown format(s): {', '.join(unknown)}")
+    if not args.inputs and not args.manifest:
+        parser.error("Give at least one input path or --manifest")
+
+    decode_options = {"language": args.language} if args.language else {}
+    items = collect_items(args.inputs, args.manifest)
+    summary = run_batch(
+        items, args.output_dir, args.model, args.workers, formats, decode_options, engine=args.engine,
+        vad=args.vad
+    )
+
+    print(
+        f"\nCompleted {summary['completed']}, failed {summary['failed']}, skipped {summary['skipped']} "
+        f"(already done)\n"
+        f"Audio: {summary['audio_seconds'] / 3600:.2f} h in {summary['wall_seconds'] / 3600:.2f} h wall clock "
+        f"-> {summary['throughput']:.2f} audio hours per hour"
+    )
+    if summary["stage_seconds"]:
+        stages = ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in summary["stage_seconds"].items())
+        print(f"Worker time by stage: {stages}")
+        print(f"Language detection skipped for {summary['languages_cached']} file(s) with a cached language")
+    if args.metrics:
+        stage_metrics.dump_json(args.metrics)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,538 @@
+"""Benchmarks for realtime factor, model load time, memory and throughput.
+
+Example:
+    python benchmark.py --models tiny,base --durations 10,60 --workers 1,2,4 --output bench.json
+    python benchmark.py --fixtures samples/ --models base --output bench.json
+    python benchmark.py --compare baseline.json bench.json
+
+Each (engine, model) pair and each worker count runs in a fresh process, so load times and
+peak RSS are cold and do not leak into each other. TTS is measured against FakeTTSClient,
+a local stand-in for the Google client, so the numbers show our own overhead and
+concurrency, not the network. The results are one JSON document; --compare prints the
+metrics that got worse between two of them and exits non-zero when any did.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, decode_audio
+from stt_engines import DEFAULT_ENGINE, ENGINES
+from tts_async import AsyncTTSService
+from tts_service import FIRST_CHUNK_BYTES, MAX_INPUT_BYTES, iter_synthesize_long, join_mp3, split_text
+
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module; peak RSS is then reported as None
+    resource = None
+
+DEFAULT_MODELS = ("tiny", "base")
+DEFAULT_DURATIONS = (10, 60)
+DEFAULT_WORKER_COUNTS = (1, 2)
+# Jobs pushed through the queue for each worker count, and the length of each clip
+THROUGHPUT_JOBS = 8
+THROUGHPUT_CLIP_SECONDS = 10
+MEDIA_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".mp4", ".mov", ".mkv"}
+
+# Text sizes (characters) and concurrent requests for the TTS benchmark
+TTS_TEXT_CHARS = (200, 1000, 4000)
+TTS_CONCURRENCY = (1, 4)
+TTS_REQUESTS = 16
+# Long documents for the chunked synthesis benchmark, and the in-flight limits to try
+TTS_LONG_TEXT_CHARS = (20000, 100000)
+TTS_LONG_WORKERS = (1, 4)
+# A burst of requests against a quota, with this share of calls failing with 429/503
+TTS_BURST_REQUESTS = 60
+TTS_BURST_REQUESTS_PER_MINUTE = 1200
+TTS_BURST_FAILURE_RATE = 0.2
+# Fake TTS latency: a fixed round trip plus time per input character
+FAKE_TTS_LATENCY_SECONDS = 0.05
+FAKE_TTS_SECONDS_PER_CHAR = 0.0001
+# A change counts as a regression when it is this much worse than the baseline
+REGRESSION_THRESHOLD = 0.10
+
+SAMPLE_TEXT = (
+    "The quick brown fox jumps over the lazy dog. "
+    "Speech synthesis turns written words into natural sounding audio. "
+    "Every sentence here is only filler for measuring throughput. "
+)
+
+
+def synthetic_audio(seconds, seed=0):
+    """Speech-like test audio: voiced syllables with harmonics, separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(harmonic * phase) / harmonic for harmonic in range(1, 6))
+    # About four syllables a second, with a pause every couple of seconds
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.4 * t) > -0.6)
+    audio = 0.2 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def fixture_audio(path, seconds):
+    """A real recording looped or cut to `seconds`."""
+    audio = decode_audio(path)
+    length = int(seconds * SAMPLE_RATE)
+    repeats = -(-length // max(len(audio), 1))
+    return np.tile(audio, repeats)[:length]
+
+
+def _load_audio(spec):
+    """Builds the audio for an (kind, seconds, path) spec inside the worker process."""
+    kind, seconds, path = spec
+    return synthetic_audio(seconds) if kind == "synthetic" else fixture_audio(path, seconds)
+
+
+def _spec_name(spec):
+    kind, seconds, path = spec
+    return f"{kind if kind == 'synthetic' else os.path.basename(path)}:{seconds:g}s"
+
+
+def audio_specs(durations, fixtures=()):
+    """Returns one spec per duration for synthetic audio and for every fixture file."""
+    paths = []
+    for entry in fixtures:
+        if os.path.isdir(entry):
+            paths.extend(
+                os.path.join(entry, name) for name in sorted(os.listdir(entry))
+                if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS
+            )
+        else:
+            paths.append(entry)
+    specs = [("synthetic", seconds, None) for seconds in durations]
+    specs += [("fixture", seconds, path) for path in paths for seconds in durations]
+    return specs
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _fresh_process():
+    # spawn, so every measurement starts from an empty interpreter
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _measure_model(engine, model_size, specs):
+    """Loads one model and decodes every spec; runs in its own process."""
+    from stt_engines import get_engine
+
+    stt_engine = get_engine(engine)
+    baseline_rss = peak_rss_mb()
+    start_time = time.perf_counter()
+    model = stt_engine.load(model_size)
+    load_seconds = time.perf_counter() - start_time
+    loaded_rss = peak_rss_mb()
+    # One untimed second first so lazy kernel setup does not count
+    stt_engine.transcribe(model, synthetic_audio(1), language="en")
+
+    runs = []
+    for spec in specs:
+        audio = _load_audio(spec)
+        duration = len(audio) / SAMPLE_RATE
+        start_time = time.perf_counter()
+        stt_engine.transcribe(model, audio, language="en")
+        seconds = time.perf_counter() - start_time
+        runs.append({
+            "audio": _spec_name(spec),
+            "audio_seconds": duration,
+            "seconds": seconds,
+            "realtime_factor": seconds / duration if duration else 0.0,
+        })
+    return {
+        "engine": engine,
+        "model": model_size,
+        "load_seconds": load_seconds,
+        "baseline_rss_mb": baseline_rss,
+        "loaded_rss_mb": loaded_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "runs": runs,
+    }
+
+
+def bench_models(engines, models, specs):
+    """Realtime factor, load time and peak RSS for every engine/model pair."""
+    results = []
+    for engine in engines:
+        for model_size in models:
+            with _fresh_process() as pool:
+                try:
+                    results.append(pool.submit(_measure_model, engine, model_size, specs).result())
+                except Exception as e:
+                    results.append({"engine": engine, "model": model_size, "error": str(e)})
+            print(f"models: {engine} {model_size} done", file=sys.stderr)
+    return results
+
+
+def _measure_throughput(engine, model_size, workers, jobs, clip_seconds):
+    """Pushes `jobs` clips through a JobQueue with `workers` workers; runs in its own process."""
+    with tempfile.TemporaryDirectory() as profile_dir:
+        # Jobs record their realtime factor; keep synthetic-audio numbers out of the real profile
+        os.environ["STT_RTF_PROFILE"] = os.path.join(profile_dir, "rtf.json")
+        from job_queue import JobQueue
+        from model_registry import registry
+        from transcription import limit_torch_threads, run_transcription_job
+
+        limit_torch_threads(max(1, (os.cpu_count() or 1) // workers))
+        # Loaded up front so the numbers are steady-state throughput
+        registry.get_model(model_size, engine)
+        clips = [synthetic_audio(clip_seconds, seed=index) for index in range(jobs)]
+        queue = JobQueue(workers=workers, max_queued=jobs)
+
+        start_time = time.perf_counter()
+        submitted = [
+            queue.submit(run_transcription_job, clip, model_size, engine=engine, language="en") for clip in clips
+        ]
+        while not all(job.finished for job in submitted):
+            time.sleep(0.05)
+        wall_seconds = time.perf_counter() - start_time
+    failed = [job.error for job in submitted if job.error]
+    return {
+        "engine": engine,
+        "model": model_size,
+        "workers": workers,
+        "jobs": jobs,
+        "failed": len(failed),
+        "wall_seconds": wall_seconds,
+        "jobs_per_hour": (jobs - len(failed)) / wall_seconds * 3600,
+        "audio_hours_per_hour": (jobs - len(failed)) * clip_seconds / wall_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_throughput(engine, model_size, worker_counts, jobs=THROUGHPUT_JOBS, clip_seconds=THROUGHPUT_CLIP_SECONDS):
+    """Jobs per hour through the job queue at each worker count."""
+    results = []
+    for workers in worker_counts:
+        with _fresh_process() as pool:
+            try:
+                results.append(
+                    pool.submit(_measure_throughput, engine, model_size, workers, jobs, clip_seconds).result()
+                )
+            except Exception as e:
+                results.append({"engine": engine, "model": model_size, "workers": workers, "error": str(e)})
+        print(f"throughput: {workers} worker(s) done", file=sys.stderr)
+    return results
+
+
+class FakeAPIError(Exception):
+    """Stands in for google.api_core's ResourceExhausted / ServiceUnavailable (same .code attribute)."""
+
+    def __init__(self, code):
+        super().__init__(f"{code} from the fake TTS service")
+        self.code = code
+
+
+class FakeTTSClient:
+    """Local stand-in for texttospeech.TextToSpeechClient.
+
+    synthesize_speech() sleeps like a real round trip and returns valid MP3 frames
+    (silent, in the 24 kHz / 32 kbps mono format the API produces) for about one second
+    of audio per 15 characters. Inputs over the API's byte limit are rejected like the
+    real service does, and `failure_rate` of the calls fail with a retryable quota or
+    overload error.
+    """
+
+    # MPEG-2 Layer III, 32 kbps, 24 kHz, mono, no padding: 96-byte frames of 576 samples
+    FRAME = b"\xff\xf3\x44\xc0" + bytes(92)
+    FRAMES_PER_SECOND = 24000 / 576
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, latency_seconds=FAKE_TTS_LATENCY_SECONDS, seconds_per_char=FAKE_TTS_SECONDS_PER_CHAR,
+                 failure_rate=0.0, seed=0):
+        self.latency_seconds = latency_seconds
+        self.seconds_per_char = seconds_per_char
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.characters = 0
+        self.failures = 0
+
+    def synthesize_speech(self, request=None, **kwargs):
+        request = request or kwargs
+        text_input = request["input"]
+        text = text_input["text"] if isinstance(text_input, dict) else text_input.text
+        if len(text.encode("utf-8")) > MAX_INPUT_BYTES:
+            raise ValueError(f"Input text is longer than {MAX_INPUT_BYTES} bytes")
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+            else:
+                self.characters += len(text)
+        if failed:
+            time.sleep(self.latency_seconds)
+            raise FakeAPIError(self._random.choice((429, 503)))
+        time.sleep(self.latency_seconds + self.seconds_per_char * len(text))
+        frames = max(1, int(len(text) / self.CHARS_PER_SECOND * self.FRAMES_PER_SECOND))
+        return SimpleNamespace(audio_content=self.FRAME * frames)
+
+
+def _sample_text(chars):
+    return (SAMPLE_TEXT * (chars // len(SAMPLE_TEXT) + 1))[:chars]
+
+
+def bench_tts(text_sizes=TTS_TEXT_CHARS, concurrency_levels=TTS_CONCURRENCY, requests=TTS_REQUESTS, client=None):
+    """Requests/s, characters/s and latency of synthesis calls at each text size and concurrency."""
+    results = []
+    for chars in text_sizes:
+        text = _sample_text(chars)
+        for concurrency in concurrency_levels:
+            tts_client = client or FakeTTSClient()
+            latencies = []
+
+            def synthesize(_):
+                start = time.perf_counter()
+                response = tts_client.synthesize_speech(
+                    request={"input": {"text": text}, "voice": {"language_code": "en-US"},
+                             "audio_config": {"audio_encoding": "MP3"}}
+                )
+                latencies.append(time.perf_counter() - start)
+                return len(response.audio_content)
+
+            start_time = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                audio_bytes = sum(pool.map(synthesize, range(requests)))
+            wall_seconds = time.perf_counter() - start_time
+            results.append({
+                "chars": chars,
+                "concurrency": concurrency,
+                "requests": requests,
+                "wall_seconds": wall_seconds,
+                "requests_per_second": requests / wall_seconds,
+                "chars_per_second": requests * chars / wall_seconds,
+                "audio_bytes_per_second": audio_bytes / wall_seconds,
+                "mean_latency_seconds": sum(latencies) / len(latencies),
+            })
+    return results
+
+
+def bench_tts_long(text_sizes=TTS_LONG_TEXT_CHARS, worker_counts=TTS_LONG_WORKERS):
+    """Time to first audio and wall time of streamed chunked synthesis for long documents.
+
+    `worker_counts` are the service's in-flight limits; rate limiting is off here.
+    """
+    results = []
+    for chars in text_sizes:
+        text = _sample_text(chars)
+        start_time = time.perf_counter()
+        chunks = len(split_text(text, first_max_bytes=FIRST_CHUNK_BYTES))
+        split_seconds = time.perf_counter() - start_time
+        for workers in worker_counts:
+            tts_client = FakeTTSClient()
+            service = AsyncTTSService(lambda: tts_client, requests_per_minute=None, max_in_flight=workers).start()
+            parts = []
+            first_audio_seconds = None
+            start_time = time.perf_counter()
+            # No cache, so every sentence is a request
+            for _, _, audio in iter_synthesize_long(
+                text, "en-US-Wavenet-A", "en-US", service=service, cache=None, first_chunk_bytes=FIRST_CHUNK_BYTES,
+            ):
+                if first_audio_seconds is None:
+                    first_audio_seconds = time.perf_counter() - start_time
+                parts.append(audio)
+            audio = join_mp3(parts)
+            wall_seconds = time.perf_counter() - start_time
+            service.close()
+            results.append({
+                "chars": chars,
+                "workers": workers,
+                "chunks": chunks,
+                "requests": tts_client.requests,
+                "split_seconds": split_seconds,
+                "first_audio_seconds": first_audio_seconds,
+                "wall_seconds": wall_seconds,
+                "chars_per_second": chars / wall_seconds,
+                "audio_bytes": len(audio),
+            })
+    return results
+
+
+def bench_tts_burst(requests=TTS_BURST_REQUESTS, requests_per_minute=TTS_BURST_REQUESTS_PER_MINUTE,
+                    failure_rate=TTS_BURST_FAILURE_RATE):
+    """Fires a burst at a rate-limited service whose backend fails now and then; reports how it copes."""
+    tts_client = FakeTTSClient(failure_rate=failure_rate)
+    service = AsyncTTSService(lambda: tts_client, requests_per_minute=requests_per_minute).start()
+    text = _sample_text(200)
+    start_time = time.perf_counter()
+    futures = [
+        service.submit(service.synthesize({"input": {"text": text}, "voice": {}, "audio_config": {}}))
+        for _ in range(requests)
+    ]
+    errors = sum(1 for future in futures if future.exception() is not None)
+    wall_seconds = time.perf_counter() - start_time
+    stats = service.stats()
+    service.close()
+    return {
+        "requests": requests,
+        "requests_per_minute": requests_per_minute,
+        "failure_rate": failure_rate,
+        "succeeded": requests - errors,
+        "errors": errors,
+        "retries": stats["retries"],
+        "wall_seconds": wall_seconds,
+        # Success rate seen by users, after retries
+        "success_rate": (requests - errors) / requests,
+    }
+
+
+def run_benchmarks(engines, models, durations, worker_counts, fixtures=(), jobs=THROUGHPUT_JOBS,
+                   stt=True, tts=True):
+    """Runs the selected benchmarks and returns the full report dict."""
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "engines": list(engines),
+            "models": list(models),
+            "durations": list(durations),
+            "worker_counts": list(worker_counts),
+        },
+    }
+    if stt:
+        report["models"] = bench_models(engines, models, audio_specs(durations, fixtures))
+        # Queue throughput with the smallest model, which is what most jobs wait behind
+        report["throughput"] = [
+            result for engine in engines for result in bench_throughput(engine, models[0], worker_counts, jobs)
+        ]
+    if tts:
+        report["tts"] = bench_tts()
+        report["tts_long"] = bench_tts_long()
+        report["tts_burst"] = bench_tts_burst()
+    return report
+
+
+# Metric -> True when higher is better
+_DIRECTIONS = {
+    "load_seconds": False,
+    "peak_rss_mb": False,
+    "realtime_factor": False,
+    "jobs_per_hour": True,
+    "audio_hours_per_hour": True,
+    "requests_per_second": True,
+    "chars_per_second": True,
+    "mean_latency_seconds": False,
+    "wall_seconds": False,
+    "first_audio_seconds": False,
+    "success_rate": True,
+}
+
+
+def flatten(report):
+    """Maps every comparable metric to a stable key, e.g. "models/pytorch/base/synthetic:10s/realtime_factor"."""
+    metrics = {}
+    for entry in report.get("models", []):
+        prefix = f"models/{entry['engine']}/{entry['model']}"
+        for name in ("load_seconds", "peak_rss_mb"):
+            if entry.get(name) is not None:
+                metrics[f"{prefix}/{name}"] = entry[name]
+        for run in entry.get("runs", []):
+            metrics[f"{prefix}/{run['audio']}/realtime_factor"] = run["realtime_factor"]
+    for entry in report.get("throughput", []):
+        prefix = f"throughput/{entry['engine']}/{entry['model']}/{entry['workers']}w"
+        for name in ("jobs_per_hour", "audio_hours_per_hour"):
+            if name in entry:
+                metrics[f"{prefix}/{name}"] = entry[name]
+    for entry in report.get("tts", []):
+        prefix = f"tts/{entry['chars']}c/{entry['concurrency']}x"
+        for name in ("requests_per_second", "chars_per_second", "mean_latency_seconds"):
+            metrics[f"{prefix}/{name}"] = entry[name]
+    for entry in report.get("tts_long", []):
+        prefix = f"tts_long/{entry['chars']}c/{entry['workers']}w"
+        for name in ("first_audio_seconds", "wall_seconds", "chars_per_second"):
+            metrics[f"{prefix}/{name}"] = entry[name]
+    if "tts_burst" in report:
+        metrics["tts_burst/success_rate"] = report["tts_burst"]["success_rate"]
+    return metrics
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Returns [(key, baseline, current, change)] for metrics that got worse by more than `threshold`."""
+    old, new = flatten(baseline), flatten(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        if not old[key]:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        higher_is_better = _DIRECTIONS[key.rsplit("/", 1)[1]]
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append((key, old[key], new[key], change))
+    return regressions
+
+
+def _csv(value, cast=str):
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark transcription and synthesis performance.")
+    parser.add_argument("--engines", default=DEFAULT_ENGINE, help=f"Comma-separated subset of {','.join(ENGINES)}")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="Comma-separated Whisper sizes")
+    parser.add_argument("--durations", default=",".join(map(str, DEFAULT_DURATIONS)),
+                        help="Comma-separated audio lengths in seconds")
+    parser.add_argument("--fixtures", nargs="*", default=[], help="Audio files or directories to benchmark as well")
+    parser.add_argument("--workers", default=",".join(map(str, DEFAULT_WORKER_COUNTS)),
+                        help="Comma-separated job queue worker counts")
+    parser.add_argument("--jobs", type=int, default=THROUGHPUT_JOBS, help="Jobs per worker-count run")
+    parser.add_argument("--skip-stt", action="store_true", help="Only run the TTS benchmark")
+    parser.add_argument("--skip-tts", action="store_true", help="Only run the STT benchmarks")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two reports instead of running benchmarks")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        regressions = compare(*reports, threshold=args.threshold)
+        for key, old, new, change in regressions:
+            print(f"REGRESSION {key}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    engines = _csv(args.engines)
+    unknown = [engine for engine in engines if engine not in ENGINES]
+    if unknown:
+        parser.error(f"Unknown engine(s): {', '.join(unknown)}")
+    report = run_benchmarks(
+        engines, _csv(args.models), _csv(args.durations, float), _csv(args.workers, int), args.fixtures,
+        jobs=args.jobs, stt=not args.skip_stt, tts=not args.skip_tts,
+    )
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
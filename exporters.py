@@ -0,0 +1,216 @@
+"""Writers for transcription results (plain text, JSON, SRT and WebVTT subtitles).
+
+Every format has an incremental writer that takes segments as they are produced and
+keeps nothing but counters in memory, so exporting very long media stays flat.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+
+
+def format_timestamp(seconds, decimal_marker=","):
+    """Formats seconds as HH:MM:SS,mmm (SRT style by default)."""
+    milliseconds = int(round(max(seconds, 0.0) * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{decimal_marker}{milliseconds:03d}"
+
+
+class SegmentWriter:
+    """Writes segments to a text stream one at a time; call finish() once at the end."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def add(self, segments):
+        """Writes a batch of new segments."""
+        for segment in segments:
+            self.write_segment(segment)
+            self.count += 1
+
+    def write_segment(self, segment):
+        raise NotImplementedError
+
+    def finish(self, language=None):
+        """Writes whatever closes the document (`language` is only known at the end)."""
+
+    def close(self):
+        """Releases scratch resources; called after finish() and when an export is aborted."""
+
+
+class TxtWriter(SegmentWriter):
+    """The transcript text, one segment after another."""
+
+    def write_segment(self, segment):
+        text = segment["text"]
+        # Whisper segments start with a space; the file should not
+        self.stream.write(text.lstrip() if self.count == 0 else text)
+
+    def finish(self, language=None):
+        self.stream.write("\n")
+
+
+class SrtWriter(SegmentWriter):
+    """SRT subtitles."""
+
+    def write_segment(self, segment):
+        if self.count:
+            self.stream.write("\n")
+        self.stream.write(
+            f"{self.count + 1}\n"
+            f"{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n"
+            f"{segment['text'].strip()}\n"
+        )
+
+
+class VttWriter(SegmentWriter):
+    """WebVTT subtitles (the format HTML5 <track> elements use)."""
+
+    def write_header(self):
+        self.stream.write("WEBVTT\n")
+
+    def write_segment(self, segment):
+        self.stream.write(
+            f"\n{format_timestamp(segment['start'], '.')} --> {format_timestamp(segment['end'], '.')}\n"
+            f"{segment['text'].strip()}\n"
+        )
+
+
+class JsonWriter(SegmentWriter):
+    """The segments, language and full text as one JSON object.
+
+    Segments are written straight into the "segments" array. The full text is escaped
+    into a scratch file on the side and copied in by finish(), so it is never held in memory.
+    """
+
+    def write_header(self):
+        self.stream.write('{"segments": [')
+        self._text = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def write_segment(self, segment):
+        entry = {
+            "id": segment.get("id", self.count),
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": segment["text"],
+        }
+        self.stream.write(("\n  " if self.count == 0 else ",\n  ") + json.dumps(entry, ensure_ascii=False))
+        # json.dumps of a string, minus its quotes, is the escaped form
+        self._text.write(json.dumps(segment["text"], ensure_ascii=False)[1:-1])
+
+    def finish(self, language=None):
+        self.stream.write(f'\n], "language": {json.dumps(language)}, "text": "')
+        self._text.seek(0)
+        shutil.copyfileobj(self._text, self.stream)
+        self.close()
+        self.stream.write('"}\n')
+
+    def close(self):
+        self._text.close()
+
+
+FORMAT_WRITERS = {
+    "txt": TxtWriter,
+    "json": JsonWriter,
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+}
+
+
+class ExportFiles:
+    """Incremental writers for several formats of one output, renamed into place on finish().
+
+    Example:
+        exports = ExportFiles("out/talk", ["srt", "json"])
+        for update in iter_transcribe(audio, "base"):
+            exports.add(update["segments"])
+        exports.finish(language)
+    """
+
+    def __init__(self, path_stem, formats):
+        self._files = []
+        self._writers = []
+        for fmt in formats:
+            path = f"{path_stem}.{fmt}"
+            temp_path = path + ".tmp"
+            stream = open(temp_path, "w", encoding="utf-8")
+            self._files.append((stream, temp_path, path))
+            self._writers.append(FORMAT_WRITERS[fmt](stream))
+
+    def add(self, segments):
+        for writer in self._writers:
+            writer.add(segments)
+
+    def finish(self, language=None):
+        """Completes every file and moves it to its final name."""
+        for writer in self._writers:
+            writer.finish(language)
+        for stream, temp_path, path in self._files:
+            stream.close()
+            os.replace(temp_path, path)
+
+    def abort(self):
+        """Closes and removes the unfinished files."""
+        for writer in self._writers:
+            writer.close()
+        for stream, temp_path, _ in self._files:
+            stream.close()
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+
+
+def _write_result(fmt, result, path):
+    """Writes a finished result through the incremental writer, under a temporary name first."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        writer = FORMAT_WRITERS[fmt](f)
+        writer.add(result["segments"])
+        writer.finish(result.get("language"))
+    os.replace(temp_path, path)
+
+
+def export_text(result, fmt):
+    """Returns a finished result rendered in `fmt` as a string (for download buttons)."""
+    buffer = io.StringIO()
+    writer = FORMAT_WRITERS[fmt](buffer)
+    writer.add(result["segments"])
+    writer.finish(result.get("language"))
+    return buffer.getvalue()
+
+
+def write_txt(result, path):
+    """Writes the full transcript text."""
+    _write_result("txt", result, path)
+
+
+def write_json(result, path):
+    """Writes the text, language and timed segments as JSON."""
+    _write_result("json", result, path)
+
+
+def write_srt(result, path):
+    """Writes the segments as SRT subtitles."""
+    _write_result("srt", result, path)
+
+
+def write_vtt(result, path):
+    """Writes the segments as WebVTT subtitles."""
+    _write_result("vtt", result, path)
+
+
+WRITERS = {
+    "txt": write_txt,
+    "json": write_json,
+    "srt": write_srt,
+    "vtt": write_vtt,
+}
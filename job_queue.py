@@ -0,0 +1,212 @@
+"""Process-wide background job queue for heavy transcription work.
+
+Jobs run on a fixed number of inference worker threads, so a Streamlit rerun or a
+closed browser tab does not kill them and the CPU is never overcommitted. Pages keep
+only the job id in session state and poll the job for progress.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent inference jobs and how many more may wait before new work is rejected
+DEFAULT_WORKERS = int(os.environ.get("STT_INFERENCE_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+DEFAULT_MAX_QUEUED = int(os.environ.get("STT_MAX_QUEUED_JOBS", str(DEFAULT_WORKERS * 4)))
+# Finished jobs are kept this long so their page can still read the result
+JOB_RETENTION_SECONDS = 3600
+# Assumed length of jobs submitted without an estimate until some have finished
+DEFAULT_JOB_SECONDS = 60.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is rejected by admission control."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job has been cancelled."""
+
+
+class Job:
+    """State of one submitted job, shared between the worker and the polling page."""
+
+    def __init__(self, description, estimated_seconds=None, slots=1):
+        self.id = uuid.uuid4().hex[:12]
+        self.description = description
+        self.estimated_seconds = estimated_seconds
+        self.slots = slots
+        self.status = QUEUED
+        self.progress = {}
+        self.segments = []
+        self.artifacts = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._order = None
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Called by job functions between units of work to stop early."""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+
+class JobQueue:
+    """Runs jobs on a fixed worker pool with admission control."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queued=DEFAULT_MAX_QUEUED, initializer=None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="stt-worker",
+            initializer=initializer,
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self.rejected = 0
+        self._mean_job_seconds = DEFAULT_JOB_SECONDS
+
+    def _purge(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def submit(self, fn, *args, description="", estimated_seconds=None, slots=1, **kwargs):
+        """Queues `fn(job, *args, **kwargs)` and returns the Job.
+
+        `estimated_seconds` (expected run time) feeds estimate_wait() for later submissions.
+        `slots` is how much capacity the job takes in admission control, e.g. the worker
+        processes a long-audio job fans out to.
+        Raises QueueFullError when all workers are busy and the wait queue is full.
+        """
+        with self._lock:
+            self._purge()
+            active = sum(job.slots for job in self._jobs.values() if not job.finished)
+            if active and active + slots > self.workers + self.max_queued:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"{active} jobs are already running or waiting; please try again shortly."
+                )
+            job = Job(description, estimated_seconds, slots)
+            job._order = next(self._counter)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _finish(self, job, status):
+        """Marks a job finished; finished_at is set first so readers of a finished job always see it."""
+        with self._lock:
+            job.finished_at = time.time()
+            job.status = status
+            if status == DONE:
+                self._mean_job_seconds = 0.8 * self._mean_job_seconds + 0.2 * (job.finished_at - job.started_at)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        job.started_at = time.time()
+        job.status = RUNNING
+        status = FAILED
+        try:
+            job.result = fn(job, *args, **kwargs)
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            self._finish(job, status)
+
+    def get(self, job_id):
+        """Returns the job with this id, or None if unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Asks a job to stop; queued jobs never start, running ones stop at the next check."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)
+        return True
+
+    def position(self, job_id):
+        """Returns how many queued jobs are ahead of this one."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            return sum(
+                1 for other in self._jobs.values()
+                if other.status == QUEUED and other._order < job._order
+            )
+
+    def estimate_wait(self):
+        """Estimated seconds before a job submitted now would start running.
+
+        Replays the running and queued jobs over the workers using their estimates
+        (or the average finished job length when a job has none).
+        """
+        now = time.time()
+        with self._lock:
+            active = sorted((job for job in self._jobs.values() if not job.finished), key=lambda job: job._order)
+            mean_seconds = self._mean_job_seconds
+        free_at = []
+        queued = []
+        for job in active:
+            expected = job.estimated_seconds or mean_seconds
+            if job.status == RUNNING:
+                free_at.append(max(expected - (now - job.started_at), 0.0))
+            else:
+                queued.append(expected)
+        # Idle workers are free right away
+        free_at += [0.0] * max(self.workers - len(free_at), 0)
+        heapq.heapify(free_at)
+        for expected in queued:
+            heapq.heappush(free_at, heapq.heappop(free_at) + expected)
+        return free_at[0]
+
+    def stats(self):
+        """Returns counts of jobs by state plus capacity settings."""
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts["workers"] = self.workers
+        counts["max_queued"] = self.max_queued
+        counts["rejected"] = self.rejected
+        return counts
+
+
+def _split_cpu_between_workers():
+    """Gives each inference worker an equal share of torch's intra-op threads."""
+    from transcription import limit_torch_threads
+    limit_torch_threads(max(1, (os.cpu_count() or 1) // DEFAULT_WORKERS))
+
+
+# Shared by every session in the process
+job_queue = JobQueue(initializer=_split_cpu_between_workers)
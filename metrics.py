@@ -0,0 +1,179 @@
+"""Per-stage latency histograms for the STT and TTS paths.
+
+Every timed stage (ffmpeg extraction, model load, decode, TTS request, ...) goes into a
+histogram keyed by service and stage. The histograms can be read as a dict, written out
+as JSON, or served in the Prometheus text format:
+
+    with stage_metrics.time("stt", "ffmpeg"):
+        audio = decode_audio(data)
+
+    METRICS_PORT=9464 streamlit run APP.py
+    curl localhost:9464/metrics        # Prometheus text
+    curl localhost:9464/metrics.json   # the same numbers as JSON
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket upper bounds in seconds; covers millisecond cache lookups up to multi-minute decodes
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Port for the /metrics endpoint; 0 leaves it off
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRIC_NAME = "app_stage_duration_seconds"
+
+
+class Histogram:
+    """Counts observations per bucket plus their sum, like a Prometheus histogram."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        # One extra slot for observations above the last bound (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimates the q-quantile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class StageMetrics:
+    """Thread-safe histograms keyed by (service, stage)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, service, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get((service, stage))
+            if histogram is None:
+                histogram = self._histograms[(service, stage)] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, service, stage):
+        """Times the enclosed block; failed attempts count too, since they also cost latency."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(service, stage, time.perf_counter() - start_time)
+
+    def snapshot(self):
+        """Returns {service: {stage: histogram summary}}."""
+        with self._lock:
+            report = {}
+            for (service, stage), histogram in sorted(self._histograms.items()):
+                report.setdefault(service, {})[stage] = histogram.snapshot()
+            return report
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump_json(self, path):
+        """Writes the snapshot to `path` (via a temporary file, so readers never see half of it)."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        os.replace(temp_path, path)
+
+    def to_prometheus(self):
+        """Renders every histogram in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each processing stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for (service, stage), histogram in sorted(self._histograms.items()):
+                labels = f'service="{service}",stage="{stage}"'
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = stage_metrics.to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = stage_metrics.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit log
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serves /metrics and /metrics.json on a background thread, once per process.
+
+    Returns the server, or None when `port` is 0 or already taken by another process.
+    """
+    global _server
+    with _server_lock:
+        if _server is None and port:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        return _server
+
+
+# Shared by every session in the process
+stage_metrics = StageMetrics()
@@ -0,0 +1,151 @@
+"""Process-wide registry of loaded Whisper models shared by all Streamlit sessions.
+
+Models are keyed by (engine name, model size) so every STT engine shares one budget.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import stage_metrics
+from stt_engines import DEFAULT_ENGINE, get_engine
+
+# RAM budget for all cached models together, configurable per deployment
+DEFAULT_RAM_BUDGET_MB = int(os.environ.get("WHISPER_MODEL_RAM_BUDGET_MB", "4096"))
+
+
+class _Entry:
+    """A cached model together with its footprint and inference lock."""
+
+    def __init__(self, model, size_mb, load_seconds):
+        self.model = model
+        self.size_mb = size_mb
+        self.load_seconds = load_seconds
+        # Callers inside using_model(); an entry in use is never evicted
+        self.users = 0
+        # Whisper installs per-call kv-cache hooks on the model, so calls on one
+        # model instance must not overlap.
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Loads each model size once per process and evicts least-recently-used sizes over budget."""
+
+    def __init__(self, ram_budget_mb=DEFAULT_RAM_BUDGET_MB):
+        self.ram_budget_mb = ram_budget_mb
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_count = 0
+        self.load_seconds_total = 0.0
+
+    def _used_mb(self):
+        return sum(entry.size_mb for entry in self._entries.values())
+
+    def _evict_for(self, needed_mb, keep=None):
+        """Drops least-recently-used models until `needed_mb` more fits in the budget.
+
+        Models in use stay: dropping them would not free their memory until they are released.
+        """
+        for key, entry in list(self._entries.items()):
+            if self._used_mb() + needed_mb <= self.ram_budget_mb:
+                break
+            if key == keep or entry.users:
+                continue
+            del self._entries[key]
+            self.evictions += 1
+
+    def _get_entry(self, key, use=False):
+        """Returns the entry for `key`, loading it if needed; with `use`, counts the caller as a user."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry.users += use
+                return entry
+            self.misses += 1
+            # Only one thread loads a given model; the others wait for it
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.users += use
+                    return entry
+                engine = get_engine(key[0])
+                self._evict_for(engine.approx_size_mb(key[1]))
+
+            start_time = time.perf_counter()
+            model = engine.load(key[1])
+            load_seconds = time.perf_counter() - start_time
+            stage_metrics.observe("stt", "model load", load_seconds)
+            entry = _Entry(model, engine.memory_mb(model), load_seconds)
+
+            with self._lock:
+                entry.users += use
+                self._entries[key] = entry
+                self.load_count += 1
+                self.load_seconds_total += load_seconds
+                self._evict_for(0, keep=key)
+                self._loading.pop(key, None)
+            return entry
+
+    def get_model(self, model_size, engine=DEFAULT_ENGINE):
+        """Returns the shared model for `model_size`, loading it on first use."""
+        return self._get_entry((engine, model_size)).model
+
+    @contextmanager
+    def using_model(self, model_size, engine=DEFAULT_ENGINE):
+        """Yields the shared model while holding its inference lock."""
+        entry = self._get_entry((engine, model_size), use=True)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.users -= 1
+                # Catch up on evictions that had to skip this model while it was in use
+                self._evict_for(0)
+
+    def is_loaded(self, model_size, engine=DEFAULT_ENGINE):
+        with self._lock:
+            return (engine, model_size) in self._entries
+
+    def stats(self):
+        """Returns hit/miss/load counters and the current cache contents."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loads": self.load_count,
+                "load_seconds_total": round(self.load_seconds_total, 3),
+                "ram_budget_mb": self.ram_budget_mb,
+                "ram_used_mb": round(self._used_mb(), 1),
+                "models": {
+                    f"{key[0]}:{key[1]}": {"size_mb": round(entry.size_mb, 1), "load_seconds": round(entry.load_seconds, 3)}
+                    for key, entry in self._entries.items()
+                },
+            }
+
+
+# Module-level instance: Streamlit re-runs page scripts but keeps imported modules,
+# so every session in the process shares this registry.
+registry = ModelRegistry()
+
+
+def get_model(model_size, engine=DEFAULT_ENGINE):
+    """Returns the process-wide shared model for `model_size` on `engine`."""
+    return registry.get_model(model_size, engine)
+
+
+def using_model(model_size, engine=DEFAULT_ENGINE):
+    """Context manager yielding the shared model with exclusive inference access."""
+    return registry.using_model(model_size, engine)
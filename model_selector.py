@@ -0,0 +1,174 @@
+"""Picks a Whisper model size from the audio duration, the queue and a latency budget.
+
+Realtime factors (processing seconds per audio second) are measured per engine and model
+size on this host: a short calibration run at startup, then refined from every finished job.
+Sizes that have not been measured yet are extrapolated from the measured ones.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, decode_audio
+from model_registry import registry
+from stt_engines import DEFAULT_ENGINE, get_engine
+
+# From fastest/least accurate to slowest/most accurate
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+
+# Latency budget for "auto" mode, from upload to finished transcript
+DEFAULT_LATENCY_SLO_SECONDS = float(os.environ.get("STT_LATENCY_SLO_SECONDS", "120"))
+# Measured realtime factors survive restarts here
+RTF_PROFILE_PATH = os.environ.get(
+    "STT_RTF_PROFILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "whisper_stt", "rtf.json"),
+)
+# Sizes timed at startup (larger ones are extrapolated until a real job has used them)
+CALIBRATION_SIZES = os.environ.get("STT_CALIBRATION_SIZES", "tiny,base").split(",")
+CALIBRATION_SECONDS = 10
+# Optional speech recording for calibration; synthetic audio decodes fewer tokens than speech
+CALIBRATION_AUDIO = os.environ.get("STT_CALIBRATION_AUDIO", "")
+# Weight of a new measurement in the running average
+SMOOTHING = 0.3
+
+# Rough PyTorch fp32 CPU realtime factors and load times, used until measurements exist
+PRIOR_RTF = {"tiny": 0.08, "base": 0.15, "small": 0.45, "medium": 1.3, "large": 2.6}
+PRIOR_LOAD_SECONDS = {"tiny": 1.0, "base": 2.0, "small": 5.0, "medium": 15.0, "large": 30.0}
+# Relative speed of the other engines
+ENGINE_SPEED = {"pytorch": 1.0, "pytorch-int8": 0.6, "whisper.cpp": 0.35}
+
+
+class RTFTracker:
+    """Running averages of realtime factor and load time per (engine, model size)."""
+
+    def __init__(self, path=RTF_PROFILE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Set when startup calibration fails; the page shows it next to the speeds
+        self.calibration_error = None
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._profile = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            self._profile = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._profile, f, indent=1)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # The profile is only an optimisation; keep the in-memory numbers
+            pass
+
+    def observe(self, engine, model_size, audio_seconds, processing_seconds, load_seconds=None):
+        """Folds one measured run into the averages."""
+        if audio_seconds <= 0:
+            return
+        rtf = processing_seconds / audio_seconds
+        with self._lock:
+            entry = self._profile.setdefault(f"{engine}:{model_size}", {"runs": 0})
+            entry["rtf"] = rtf if entry["runs"] == 0 else (1 - SMOOTHING) * entry["rtf"] + SMOOTHING * rtf
+            entry["runs"] += 1
+            if load_seconds is not None:
+                entry["load_seconds"] = load_seconds
+            self._save()
+
+    def _host_factor(self, engine):
+        """How much slower (>1) or faster (<1) than the priors the measured sizes ran."""
+        ratios = [
+            self._profile[f"{engine}:{size}"]["rtf"] / (PRIOR_RTF[size] * ENGINE_SPEED.get(engine, 1.0))
+            for size in MODEL_SIZES if f"{engine}:{size}" in self._profile
+        ]
+        return float(np.median(ratios)) if ratios else 1.0
+
+    def rtf(self, engine, model_size):
+        """Returns (realtime_factor, measured) for a model size."""
+        with self._lock:
+            entry = self._profile.get(f"{engine}:{model_size}")
+            if entry:
+                return entry["rtf"], True
+            prior = PRIOR_RTF.get(model_size, PRIOR_RTF["large"]) * ENGINE_SPEED.get(engine, 1.0)
+            return prior * self._host_factor(engine), False
+
+    def load_seconds(self, engine, model_size):
+        with self._lock:
+            entry = self._profile.get(f"{engine}:{model_size}", {})
+            return entry.get("load_seconds", PRIOR_LOAD_SECONDS.get(model_size, PRIOR_LOAD_SECONDS["large"]))
+
+    def stats(self):
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._profile.items()}
+
+
+def estimate_seconds(duration, model_size, engine=DEFAULT_ENGINE, wait_seconds=0.0):
+    """Predicted seconds until a `duration`-second file is transcribed with `model_size`."""
+    rtf, _ = rtf_tracker.rtf(engine, model_size)
+    load = 0.0 if registry.is_loaded(model_size, engine) else rtf_tracker.load_seconds(engine, model_size)
+    return wait_seconds + load + duration * rtf
+
+
+def choose_model(duration, engine=DEFAULT_ENGINE, slo_seconds=DEFAULT_LATENCY_SLO_SECONDS, wait_seconds=0.0):
+    """Returns (model_size, predicted_seconds) for the most accurate size that meets the budget.
+
+    Falls back to the fastest size when nothing fits.
+    """
+    estimates = [(size, estimate_seconds(duration, size, engine, wait_seconds)) for size in MODEL_SIZES]
+    fitting = [estimate for estimate in estimates if estimate[1] <= slo_seconds]
+    return fitting[-1] if fitting else min(estimates, key=lambda estimate: estimate[1])
+
+
+def _calibration_audio():
+    if CALIBRATION_AUDIO and os.path.exists(CALIBRATION_AUDIO):
+        return decode_audio(CALIBRATION_AUDIO)[:CALIBRATION_SECONDS * SAMPLE_RATE]
+    # Noise with a syllable-rate envelope, so the decoder has something to chew on
+    t = np.arange(CALIBRATION_SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    return (np.random.default_rng(0).standard_normal(len(t)) * 0.1 * envelope).astype(np.float32)
+
+
+def calibrate(engine=DEFAULT_ENGINE, sizes=CALIBRATION_SIZES):
+    """Times each size on a short clip and records the result (also warms the models)."""
+    audio = _calibration_audio()
+    stt_engine = get_engine(engine)
+    for model_size in sizes:
+        was_loaded = registry.is_loaded(model_size, engine)
+        start_time = time.perf_counter()
+        with registry.using_model(model_size, engine) as model:
+            load_seconds = None if was_loaded else time.perf_counter() - start_time
+            # One untimed window first so lazy kernel setup does not count
+            stt_engine.transcribe(model, audio[:SAMPLE_RATE], language="en")
+            start_time = time.perf_counter()
+            stt_engine.transcribe(model, audio, language="en")
+            processing_seconds = time.perf_counter() - start_time
+        rtf_tracker.observe(engine, model_size, len(audio) / SAMPLE_RATE, processing_seconds, load_seconds)
+
+
+_calibration_started = False
+_calibration_lock = threading.Lock()
+
+
+def start_calibration(engine=DEFAULT_ENGINE):
+    """Runs calibrate() once per process on a background thread."""
+    global _calibration_started
+    with _calibration_lock:
+        if _calibration_started or os.environ.get("STT_CALIBRATE", "1") == "0":
+            return
+        _calibration_started = True
+
+    def run():
+        try:
+            calibrate(engine)
+        except Exception as e:
+            # Estimates simply stay on the priors
+            rtf_tracker.calibration_error = str(e)
+
+    threading.Thread(target=run, name="stt-calibration", daemon=True).start()
+
+
+# Shared by every session in the process
+rtf_tracker = RTFTracker()
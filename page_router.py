@@ -0,0 +1,180 @@
+"""Lazy page router for APP.py, plus cold-start reporting.
+
+Tool pages are plain Streamlit scripts. A page is compiled the first time it is opened
+(and again only when its file changes). It then runs on every rerun in a fresh
+namespace. The modules a page imports stay in sys.modules, and so do the singletons
+that live in them (model registry, job queue, TTS client). So a page pays for its heavy
+imports only once per process, and only if somebody opens it.
+
+Compare cold import cost of the landing page with the STT/TTS stacks, each group in a
+fresh interpreter:
+    python page_router.py
+    python page_router.py --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import streamlit as st
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Page key -> (navigation label, script file name); "home" and "about" are drawn by APP.py
+PAGES = {
+    "WhisperSTT": ("Speech-to-Text", "WhisperSTT.py"),
+    "GoogleTTS": ("Text-to-Speech", "GoogleTTs.py"),
+}
+NAVIGATION = {"home": "Home", **{key: label for key, (label, _) in PAGES.items()}, "about": "About"}
+
+# Modules behind each part of the app, for the cold import report
+IMPORT_GROUPS = {
+    "landing page": ["streamlit", "PIL.Image", "preload"],
+    "speech-to-text": ["transcription", "streaming_stt", "model_selector", "pandas", "torch", "whisper"],
+    "text-to-speech": ["requests", "google.cloud.texttospeech", "docx", "PyPDF2"],
+}
+
+_code_cache = {}
+_render_times = {}
+_lock = threading.Lock()
+
+
+def find_page_file(key):
+    """Returns the script path for a page key, looking in pages/ first and then next to APP.py."""
+    file_name = PAGES[key][1]
+    for directory in (os.path.join(APP_DIR, "pages"), APP_DIR):
+        if not os.path.isdir(directory):
+            continue
+        # File names differ in case between checkouts (GoogleTTS.py / GoogleTTs.py)
+        for name in os.listdir(directory):
+            if name.lower() == file_name.lower():
+                return os.path.join(directory, name)
+    return None
+
+
+def _page_code(path):
+    """Returns the compiled page script, recompiling only when the file has changed."""
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _code_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    with _lock:
+        _code_cache[path] = (mtime, code)
+    return code
+
+
+def record_render(name, seconds):
+    """Records one render of a page; the first one includes its imports and setup."""
+    with _lock:
+        times = _render_times.setdefault(name, {"first_s": seconds, "last_s": seconds, "runs": 0})
+        times["last_s"] = seconds
+        times["runs"] += 1
+
+
+def render_times():
+    with _lock:
+        return {name: dict(times) for name, times in _render_times.items()}
+
+
+def _on_navigate():
+    st.session_state["page"] = st.session_state["_navigation"]
+
+
+def render_navigation():
+    """Draws the sidebar page switcher; a change simply reruns the script on the new page."""
+    st.session_state["_navigation"] = st.session_state.get("page", "home")
+    st.sidebar.title("Navigation")
+    st.sidebar.radio(
+        "Go to",
+        list(NAVIGATION),
+        format_func=NAVIGATION.get,
+        key="_navigation",
+        on_change=_on_navigate,
+    )
+
+
+def navigate(key):
+    """Switches to another page from a button or link handler."""
+    st.session_state["page"] = key
+    st.rerun()
+
+
+def run_page(key):
+    """Runs a tool page script; the navigation is drawn after it, even when the page stops early."""
+    path = find_page_file(key)
+    if path is None:
+        st.error(f"{PAGES[key][1]} was not found next to APP.py or in pages/")
+        render_navigation()
+        return
+    start_time = time.perf_counter()
+    try:
+        exec(_page_code(path), {"__name__": "__main__", "__file__": path})
+    finally:
+        record_render(key, time.perf_counter() - start_time)
+        render_navigation()
+
+
+def measure_imports(modules):
+    """Imports `modules` in order in a fresh interpreter and returns {module: seconds or None}.
+
+    If the interpreter dies (e.g. an import crashes it), every module is reported as None
+    and the reason goes to stderr.
+    """
+    script = (
+        "import importlib, json, sys, time\n"
+        "times = {}\n"
+        "for name in sys.argv[1:]:\n"
+        "    start = time.perf_counter()\n"
+        "    try:\n"
+        "        importlib.import_module(name)\n"
+        "    except Exception:\n"
+        "        times[name] = None\n"
+        "        continue\n"
+        "    times[name] = time.perf_counter() - start\n"
+        "print(json.dumps(times))\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", script, *modules], capture_output=True, text=True, cwd=APP_DIR
+    )
+    # Streamlit and friends may log to stdout while importing; the report is the last line
+    lines = process.stdout.strip().splitlines()
+    if process.returncode == 0 and lines:
+        try:
+            return json.loads(lines[-1])
+        except ValueError:
+            pass
+    reason = (process.stderr.strip().splitlines() or ["no output"])[-1]
+    print(f"Import measurement of {', '.join(modules)} failed (exit code {process.returncode}): {reason}",
+          file=sys.stderr)
+    return {name: None for name in modules}
+
+
+def import_report():
+    """Cold import seconds per module for every group in IMPORT_GROUPS."""
+    return {group: measure_imports(modules) for group, modules in IMPORT_GROUPS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold import time of each part of the app.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    report = import_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for group, times in report.items():
+        total = sum(seconds for seconds in times.values() if seconds is not None)
+        print(f"{group}: {total:.2f}s")
+        for name, seconds in times.items():
+            print(f"  {name:<28}{'not importable' if seconds is None else f'{seconds:.3f}s':>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Background warm-up of the Whisper model(s) and the TTS client when the app starts.
+
+The landing page calls start_preloading() and shows status(); by the time a user opens
+a tool the models are already resident in model_registry and the first request does not
+pay the cold-start cost.
+"""
+import os
+import threading
+import time
+
+from model_registry import registry
+from stt_engines import DEFAULT_ENGINE
+
+# Comma-separated Whisper sizes to load at startup ("base" is the pages' default choice)
+PRELOAD_MODELS = [size for size in os.environ.get("STT_PRELOAD_MODELS", "base").split(",") if size]
+PRELOAD_TTS = os.environ.get("PRELOAD_TTS", "1") != "0"
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class Preloader:
+    """Runs warm-up tasks on background threads and reports their real state."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._started = False
+
+    def _run(self, name, fn):
+        with self._lock:
+            self._tasks[name]["status"] = LOADING
+        start_time = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            with self._lock:
+                self._tasks[name].update(status=FAILED, error=str(e), seconds=time.perf_counter() - start_time)
+            return
+        with self._lock:
+            self._tasks[name].update(status=READY, seconds=time.perf_counter() - start_time)
+
+    def start(self, sequential, parallel=None):
+        """Starts the tasks ({name: fn}) once per process; later calls do nothing.
+
+        `sequential` tasks run one after another on a single thread (model loads are CPU
+        and disk bound and would only compete); each `parallel` task gets its own thread.
+        """
+        parallel = parallel or {}
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for name in list(sequential) + list(parallel):
+                self._tasks[name] = {"status": PENDING, "seconds": None, "error": None}
+
+        def run_sequential():
+            for name, fn in sequential.items():
+                self._run(name, fn)
+
+        threading.Thread(target=run_sequential, name="preload-models", daemon=True).start()
+        for name, fn in parallel.items():
+            threading.Thread(target=self._run, args=(name, fn), name=f"preload-{name}", daemon=True).start()
+
+    def status(self):
+        """Returns {name: {"status", "seconds", "error"}} for every task."""
+        with self._lock:
+            return {name: dict(task) for name, task in self._tasks.items()}
+
+    @property
+    def finished(self):
+        with self._lock:
+            return all(task["status"] in (READY, FAILED) for task in self._tasks.values())
+
+
+def _tts_warmup():
+    from tts_service import get_tts_service
+    get_tts_service().start()
+
+
+def start_preloading(models=None, engine=DEFAULT_ENGINE, tts=PRELOAD_TTS):
+    """Starts warming up the configured Whisper models and the TTS client in the background."""
+    model_tasks = {
+        f"Whisper {model_size} ({engine})": lambda model_size=model_size: registry.get_model(model_size, engine)
+        for model_size in models or PRELOAD_MODELS
+    }
+    # The TTS client only waits on the network, so it starts alongside the model loads
+    client_tasks = {"Text-to-Speech client": _tts_warmup} if tts else {}
+    preloader.start(model_tasks, client_tasks)
+    return preloader
+
+
+# Shared by every session in the process
+preloader = Preloader()
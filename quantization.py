@@ -0,0 +1,115 @@
+"""int8 dynamic quantization of PyTorch Whisper models for CPU inference.
+
+Quantizing takes a while, so the quantized model is saved to disk after the first run
+and later loads read it directly instead of quantizing again.
+
+Compare against fp32 on this host:
+    python quantization.py --sizes tiny base small --audio samples/jfk.wav
+"""
+import argparse
+import io
+import os
+import time
+
+# Where quantized models are stored between runs
+QUANTIZED_CACHE_DIR = os.environ.get(
+    "WHISPER_QUANTIZED_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "whisper_stt", "quantized"),
+)
+
+
+def quantize_whisper_model(model):
+    """Quantizes the Linear layers of a CPU fp32 Whisper model to int8 in place."""
+    import torch
+    import whisper.model
+
+    # whisper.model.Linear only adds a dtype cast in forward(); turning it back into a plain
+    # nn.Linear lets quantize_dynamic recognise and swap it (it matches exact types).
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def quantized_model_path(model_size):
+    return os.path.join(QUANTIZED_CACHE_DIR, f"{model_size}-int8.pt")
+
+
+def load_quantized_model(model_size):
+    """Returns the int8 model for `model_size`, quantizing and saving it on first use."""
+    import torch
+    import whisper
+
+    path = quantized_model_path(model_size)
+    if os.path.exists(path):
+        # The file holds the whole pickled module, not just tensors
+        return torch.load(path, map_location="cpu", weights_only=False)
+
+    model = quantize_whisper_model(whisper.load_model(model_size, device="cpu"))
+    os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+    temp_path = path + ".tmp"
+    torch.save(model, temp_path)
+    os.replace(temp_path, path)
+    return model
+
+
+def serialized_size_mb(model):
+    """Size of a model's state dict in MB (counts packed int8 weights, unlike parameters())."""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def compare_model(model_size, audio, runs=3):
+    """Measures load time, size and decode latency of fp32 vs int8 for one model size."""
+    import whisper
+
+    row = {"model": model_size}
+    for variant, loader in (
+        ("fp32", lambda: whisper.load_model(model_size, device="cpu")),
+        ("int8", lambda: load_quantized_model(model_size)),
+    ):
+        start_time = time.perf_counter()
+        model = loader()
+        row[f"{variant}_load_s"] = time.perf_counter() - start_time
+        row[f"{variant}_mb"] = serialized_size_mb(model)
+
+        # First call warms up kernels; report the best of the remaining runs
+        model.transcribe(audio, fp16=False, language="en")
+        latencies = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            model.transcribe(audio, fp16=False, language="en")
+            latencies.append(time.perf_counter() - start_time)
+        row[f"{variant}_latency_s"] = min(latencies)
+        del model
+
+    row["memory_reduction"] = 1 - row["int8_mb"] / row["fp32_mb"]
+    row["speedup"] = row["fp32_latency_s"] / row["int8_latency_s"]
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 Whisper models on CPU.")
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small", "medium", "large"])
+    parser.add_argument("--audio", required=True, help="Audio file used for the latency runs")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from audio_io import decode_audio
+    audio = decode_audio(args.audio)
+
+    print(f"{'model':<8}{'fp32 MB':>10}{'int8 MB':>10}{'mem -%':>8}{'fp32 s':>10}{'int8 s':>10}{'speedup':>9}")
+    for model_size in args.sizes:
+        row = compare_model(model_size, audio, args.runs)
+        print(
+            f"{row['model']:<8}{row['fp32_mb']:>10.0f}{row['int8_mb']:>10.0f}"
+            f"{row['memory_reduction'] * 100:>7.0f}%{row['fp32_latency_s']:>10.2f}"
+            f"{row['int8_latency_s']:>10.2f}{row['speedup']:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
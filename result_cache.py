@@ -0,0 +1,232 @@
+"""Content-addressed on-disk caches of transcription results and detected languages."""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Where results are stored and how much disk they may use
+DEFAULT_CACHE_DIR = os.environ.get(
+    "STT_RESULT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "whisper_stt", "results"),
+)
+DEFAULT_MAX_MB = int(os.environ.get("STT_RESULT_CACHE_MB", "512"))
+# Detected languages per audio hash, shared by the pages and batch runs
+DEFAULT_LANGUAGE_CACHE_PATH = os.environ.get(
+    "STT_LANGUAGE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "whisper_stt", "languages.json"),
+)
+MAX_LANGUAGE_ENTRIES = 10000
+
+
+def hash_audio(data):
+    """Returns the SHA-256 hex digest of the original file bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_key(audio_hash, model_size, options=None):
+    """Builds the cache key from the audio content hash, model size and decode options."""
+    payload = json.dumps(
+        {"audio": audio_hash, "model": model_size, "options": options or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def transcription_key(audio_hash, model_size, engine, long_audio=False, vad=False, language=None, **decode_options):
+    """The cache key for a transcription; the pages and the batch CLI both use it, so they share results."""
+    return make_key(
+        audio_hash,
+        model_size,
+        dict(decode_options, long_audio=long_audio, engine=engine, vad=vad, language=language or None),
+    )
+
+
+def _to_builtin(value):
+    """Converts NumPy scalars (as found in some Whisper segment fields) for JSON."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+class ResultCache:
+    """Stores results as gzip-compressed JSON files and evicts least-recently-used ones over budget."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.hit_seconds_total = 0.0
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], key + ".json.gz")
+
+    def _entries(self):
+        """Returns (path, size, mtime) for every cached result."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        info = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, info.st_size, info.st_mtime))
+        return entries
+
+    def _ensure_total(self):
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def get(self, key):
+        """Returns the cached result for `key`, or None."""
+        start_time = time.perf_counter()
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            self.hit_seconds_total += time.perf_counter() - start_time
+        return result
+
+    def put(self, key, result):
+        """Stores a result, then evicts the least-recently-used entries over the size limit."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = gzip.compress(
+            json.dumps(result, default=_to_builtin, separators=(",", ":")).encode("utf-8")
+        )
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            self._ensure_total()
+            if os.path.exists(path):
+                self._total_bytes -= os.path.getsize(path)
+            os.replace(temp_path, path)
+            self._total_bytes += len(data)
+            self.stores += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Returns hit/miss counters and disk usage."""
+        with self._lock:
+            self._ensure_total()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "avg_hit_ms": round(1000 * self.hit_seconds_total / self.hits, 2) if self.hits else 0.0,
+                "disk_used_mb": round(self._total_bytes / (1024 * 1024), 2),
+                "max_mb": self.max_bytes // (1024 * 1024),
+            }
+
+
+class LanguageCache:
+    """Remembers the detected language of each audio hash so later runs can skip detection.
+
+    Entries live in one small JSON file; oldest entries are dropped over MAX_LANGUAGE_ENTRIES.
+    """
+
+    def __init__(self, path=DEFAULT_LANGUAGE_CACHE_PATH, max_entries=MAX_LANGUAGE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._languages = None
+        self.hits = 0
+        self.misses = 0
+        self.detections = 0
+        self.detect_seconds_total = 0.0
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            return {}
+
+    def _ensure_loaded(self):
+        if self._languages is None:
+            self._languages = self._read()
+
+    def get(self, audio_hash):
+        """Returns the cached language code for `audio_hash`, or None."""
+        with self._lock:
+            self._ensure_loaded()
+            language = self._languages.get(audio_hash)
+            if language is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return language
+
+    def put(self, audio_hash, language, detect_seconds=None):
+        """Stores a detected language; `detect_seconds` feeds the time-saved estimate.
+
+        Leave it None for languages found while transcribing, which had no detection step to time.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if detect_seconds is not None:
+                self.detections += 1
+                self.detect_seconds_total += detect_seconds
+            # Other processes (batch workers) may have added entries since we loaded
+            self._languages = dict(self._read(), **self._languages)
+            self._languages.pop(audio_hash, None)
+            self._languages[audio_hash] = language
+            for old_hash in list(self._languages)[:-self.max_entries]:
+                del self._languages[old_hash]
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._languages, f)
+            os.replace(temp_path, self.path)
+
+    def stats(self):
+        """Returns hit/miss counters and the detection time saved by hits."""
+        with self._lock:
+            avg_detect = self.detect_seconds_total / self.detections if self.detections else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "avg_detect_s": round(avg_detect, 3),
+                "saved_s": round(self.hits * avg_detect, 2),
+            }
+
+
+# Shared by every session in the process
+result_cache = ResultCache()
+language_cache = LanguageCache()
@@ -0,0 +1,214 @@
+"""Real-time streaming transcription over a sliding decode window.
+
+Audio arrives as small PCM frames. Every `step_seconds` the current window is decoded:
+segments that are safely behind the live edge are emitted as final and dropped from the
+window, the rest is emitted as a partial hypothesis that may still change.
+
+Replay a WAV file at real-time speed and report latency percentiles:
+    python streaming_stt.py samples/jfk.wav --model tiny
+"""
+import argparse
+import bisect
+import time
+import wave
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, decode_audio
+from model_registry import using_model
+from stt_engines import DEFAULT_ENGINE, get_engine
+
+# Decode again after this much new audio
+DEFAULT_STEP_SECONDS = 1.0
+# Segments ending closer than this to the live edge stay partial (the next word may change them)
+DEFAULT_HOLDBACK_SECONDS = 1.5
+# The window never grows past this; older audio is force-finalized to bound latency
+DEFAULT_MAX_WINDOW_SECONDS = 15.0
+
+
+class StreamingTranscriber:
+    """Turns a stream of PCM frames into partial and final transcript events."""
+
+    def __init__(self, model_size="tiny", engine=DEFAULT_ENGINE, language=None,
+                 step_seconds=DEFAULT_STEP_SECONDS, holdback_seconds=DEFAULT_HOLDBACK_SECONDS,
+                 max_window_seconds=DEFAULT_MAX_WINDOW_SECONDS):
+        self.model_size = model_size
+        self.engine = engine
+        self.language = language
+        self.step_samples = int(step_seconds * SAMPLE_RATE)
+        self.holdback_seconds = holdback_seconds
+        self.max_window_samples = int(max_window_seconds * SAMPLE_RATE)
+
+        self._window = np.zeros(0, dtype=np.float32)
+        # Stream time (seconds) of the first sample in the window
+        self._window_start = 0.0
+        self._pending = 0
+        self._received = 0
+        # (stream seconds, wall clock) pairs used to measure end-to-end latency
+        self._arrivals_at = []
+        self._arrivals_wall = []
+        self.final_segments = []
+        self.partial_text = ""
+        self.final_latencies = []
+        self.partial_latencies = []
+        self.finished = False
+
+    @property
+    def text(self):
+        """Finalized text followed by the current partial hypothesis."""
+        return "".join(segment["text"] for segment in self.final_segments) + self.partial_text
+
+    def feed(self, frames):
+        """Adds PCM frames (16 kHz mono float32) and returns any new events."""
+        frames = np.asarray(frames, dtype=np.float32)
+        self._window = np.concatenate([self._window, frames])
+        self._received += len(frames)
+        self._pending += len(frames)
+        self._arrivals_at.append(self._received / SAMPLE_RATE)
+        self._arrivals_wall.append(time.perf_counter())
+        if self._pending < self.step_samples:
+            return []
+        self._pending = 0
+        return self._decode(final=False)
+
+    def flush(self):
+        """Finalizes whatever is left in the window (end of stream)."""
+        self.finished = True
+        if len(self._window) == 0:
+            return []
+        return self._decode(final=True)
+
+    def _arrival_time(self, stream_seconds):
+        """Wall-clock time at which the audio up to `stream_seconds` had been received."""
+        index = bisect.bisect_left(self._arrivals_at, stream_seconds)
+        return self._arrivals_wall[min(index, len(self._arrivals_wall) - 1)]
+
+    def _decode(self, final):
+        with using_model(self.model_size, self.engine) as model:
+            result = get_engine(self.engine).transcribe(model, self._window, language=self.language)
+        if self.language is None:
+            # Keep the detected language so later windows skip detection
+            self.language = result.get("language")
+
+        now = time.perf_counter()
+        window_seconds = len(self._window) / SAMPLE_RATE
+        segments = result["segments"]
+        if final:
+            stable_count = len(segments)
+        else:
+            live_edge = window_seconds - self.holdback_seconds
+            stable_count = sum(1 for segment in segments if segment["end"] <= live_edge)
+            # Never let only the last segment remain stable: it may continue into new audio
+            stable_count = min(stable_count, max(len(segments) - 1, 0))
+            if stable_count == 0 and len(self._window) >= self.max_window_samples and segments:
+                # The window is full: force-finalize, even a single segment, so no text is lost
+                stable_count = max(len(segments) - 1, 1)
+
+        events = []
+        for segment in segments[:stable_count]:
+            finalized = {
+                "start": self._window_start + segment["start"],
+                "end": self._window_start + segment["end"],
+                "text": segment["text"],
+            }
+            self.final_segments.append(finalized)
+            latency = now - self._arrival_time(finalized["end"])
+            self.final_latencies.append(latency)
+            events.append(dict(finalized, type="final", latency=latency))
+
+        # Slide the window past everything that was finalized
+        if final:
+            cut_seconds = window_seconds
+        elif stable_count:
+            cut_seconds = segments[stable_count - 1]["end"]
+        elif not segments and len(self._window) > self.max_window_samples:
+            # No speech in a full window: drop the oldest audio to stay bounded
+            cut_seconds = (len(self._window) - self.max_window_samples) / SAMPLE_RATE
+        else:
+            cut_seconds = 0.0
+        cut = min(int(cut_seconds * SAMPLE_RATE), len(self._window))
+        self._window = self._window[cut:]
+        self._window_start += cut / SAMPLE_RATE
+        # Arrival times before the window are no longer needed
+        keep_from = max(bisect.bisect_left(self._arrivals_at, self._window_start) - 1, 0)
+        del self._arrivals_at[:keep_from]
+        del self._arrivals_wall[:keep_from]
+
+        self.partial_text = "" if final else "".join(segment["text"] for segment in segments[stable_count:])
+        if self.partial_text:
+            latency = now - self._arrival_time(self._received / SAMPLE_RATE)
+            self.partial_latencies.append(latency)
+            events.append({"type": "partial", "text": self.partial_text, "latency": latency})
+        return events
+
+
+def read_wav(path):
+    """Reads a 16 kHz mono 16-bit WAV directly, or decodes anything else with ffmpeg."""
+    try:
+        with wave.open(path, "rb") as wav_file:
+            if (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth()) == (SAMPLE_RATE, 1, 2):
+                data = wav_file.readframes(wav_file.getnframes())
+                return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    except wave.Error:
+        pass
+    return decode_audio(path)
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Returns {"p50": ..., ...} for a list of latencies in seconds."""
+    if not values:
+        return {f"p{point}": None for point in points}
+    return {f"p{point}": float(np.percentile(values, point)) for point in points}
+
+
+def replay(audio, transcriber, frame_seconds=0.1, realtime=True, on_event=None):
+    """Feeds audio to a transcriber frame by frame, optionally paced at real-time speed."""
+    frame = int(frame_seconds * SAMPLE_RATE)
+    start_time = time.perf_counter()
+    for index, offset in enumerate(range(0, len(audio), frame)):
+        if realtime:
+            # Wait until this frame would have been captured by a microphone
+            delay = start_time + (index + 1) * frame_seconds - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        for event in transcriber.feed(audio[offset:offset + frame]):
+            if on_event:
+                on_event(event)
+    for event in transcriber.flush():
+        if on_event:
+            on_event(event)
+    return {
+        "final": percentiles(transcriber.final_latencies),
+        "partial": percentiles(transcriber.partial_latencies),
+        "segments": len(transcriber.final_segments),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a WAV file through the streaming transcriber.")
+    parser.add_argument("wav", help="Audio file to replay (16 kHz mono WAV is read without ffmpeg)")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--language")
+    parser.add_argument("--step", type=float, default=DEFAULT_STEP_SECONDS)
+    parser.add_argument("--fast", action="store_true", help="Feed as fast as possible instead of real time")
+    args = parser.parse_args(argv)
+
+    transcriber = StreamingTranscriber(args.model, args.engine, args.language, step_seconds=args.step)
+
+    def print_event(event):
+        if event["type"] == "final":
+            print(f"[{event['start']:7.2f}s - {event['end']:7.2f}s] {event['text'].strip()}"
+                  f"  (latency {event['latency']:.2f}s)")
+
+    report = replay(read_wav(args.wav), transcriber, realtime=not args.fast, on_event=print_event)
+    for kind in ("final", "partial"):
+        values = ", ".join(
+            f"{name} {value:.2f}s" if value is not None else f"{name} n/a"
+            for name, value in report[kind].items()
+        )
+        print(f"{kind} latency: {values}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Speech-to-text engines behind one interface (PyTorch Whisper, int8 PyTorch and whisper.cpp).
+
+Every engine loads a model handle once (cached by model_registry) and returns results
+in the structure produced by `whisper.transcribe`: {"text", "segments", "language"}.
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+from audio_io import pcm_to_wav_bytes
+
+# --- whisper.cpp settings ---
+# Directory with ggml model files and the CLI binary (newer builds call it whisper-cli)
+WHISPER_CPP_MODELS_DIR = os.environ.get("WHISPER_CPP_MODELS_DIR", os.path.join("whisper.cpp", "models"))
+WHISPER_CPP_BIN = os.environ.get("WHISPER_CPP_BIN", "")
+WHISPER_CPP_MODEL_FILES = {
+    "tiny": "ggml-tiny.bin",
+    "base": "ggml-base.bin",
+    "small": "ggml-small.bin",
+    "medium": "ggml-medium.bin",
+    "large": "ggml-large-v3.bin",
+}
+
+
+class EngineUnavailableError(RuntimeError):
+    """Raised when an engine's binary, bindings or model files are missing."""
+
+
+class STTEngine:
+    """Interface implemented by every speech-to-text backend."""
+
+    name = ""
+    label = ""
+
+    def approx_size_mb(self, model_size):
+        """Expected memory of a loaded model, used to make room before loading."""
+        return 0
+
+    def load(self, model_size):
+        """Loads and returns a model handle for `model_size`."""
+        raise NotImplementedError
+
+    def memory_mb(self, model):
+        """Returns the memory held by a loaded model handle."""
+        return 0
+
+    def detect_language(self, model, audio):
+        """Returns the language code spoken in the first 30 s, or None if the engine cannot tell on its own."""
+        return None
+
+    def transcribe(self, model, audio, language=None, initial_prompt=None, **options):
+        """Transcribes 16 kHz float32 samples and returns {"text", "segments", "language"}."""
+        raise NotImplementedError
+
+
+class PyTorchWhisperEngine(STTEngine):
+    """The reference openai-whisper implementation."""
+
+    name = "pytorch"
+    label = "PyTorch Whisper"
+
+    # Approximate fp32 footprint in MB
+    APPROX_MODEL_MB = {
+        "tiny": 150,
+        "base": 290,
+        "small": 970,
+        "medium": 3060,
+        "large": 6170,
+    }
+
+    def approx_size_mb(self, model_size):
+        return self.APPROX_MODEL_MB.get(model_size, 0)
+
+    def load(self, model_size):
+        # Imported lazily so the engine list stays cheap to import
+        import whisper
+        return whisper.load_model(model_size)
+
+    def memory_mb(self, model):
+        total = 0
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            total += tensor.numel() * tensor.element_size()
+        return total / (1024 * 1024)
+
+    def detect_language(self, model, audio):
+        import whisper
+
+        # One encoder pass over a 30 s mel window, the same thing transcribe() does internally
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), model.dims.n_mels).to(model.device)
+        _, probs = model.detect_language(mel)
+        return max(probs, key=probs.get)
+
+    def transcribe(self, model, audio, language=None, initial_prompt=None, **options):
+        return model.transcribe(audio, language=language, initial_prompt=initial_prompt, **options)
+
+
+class QuantizedWhisperEngine(PyTorchWhisperEngine):
+    """PyTorch Whisper with int8 dynamically quantized Linear layers, for CPU-only hosts."""
+
+    name = "pytorch-int8"
+    label = "PyTorch Whisper (int8, CPU)"
+
+    def approx_size_mb(self, model_size):
+        # Linear weights dominate the model and shrink to a quarter
+        return self.APPROX_MODEL_MB.get(model_size, 0) * 0.35
+
+    def load(self, model_size):
+        from quantization import load_quantized_model
+        return load_quantized_model(model_size)
+
+    def memory_mb(self, model):
+        from quantization import serialized_size_mb
+        return serialized_size_mb(model)
+
+    def transcribe(self, model, audio, language=None, initial_prompt=None, **options):
+        # Quantized kernels are CPU fp32/int8 only
+        options["fp16"] = False
+        return super().transcribe(model, audio, language=language, initial_prompt=initial_prompt, **options)
+
+
+class _WhisperCppCli:
+    """A ggml model run through the whisper.cpp command-line binary."""
+
+    def __init__(self, binary, model_path):
+        self.binary = binary
+        self.model_path = model_path
+
+
+class WhisperCppEngine(STTEngine):
+    """whisper.cpp with GGML models, via pywhispercpp bindings when installed, else the CLI."""
+
+    name = "whisper.cpp"
+    label = "whisper.cpp (GGML)"
+
+    def __init__(self, models_dir=WHISPER_CPP_MODELS_DIR, binary=WHISPER_CPP_BIN, threads=None):
+        self.models_dir = models_dir
+        self.binary = binary
+        self.threads = threads or os.cpu_count() or 1
+
+    def model_path(self, model_size):
+        return os.path.join(self.models_dir, WHISPER_CPP_MODEL_FILES.get(model_size, f"ggml-{model_size}.bin"))
+
+    def approx_size_mb(self, model_size):
+        path = self.model_path(model_size)
+        return os.path.getsize(path) / (1024 * 1024) if os.path.exists(path) else 0
+
+    def _find_binary(self):
+        candidates = [self.binary] if self.binary else ["whisper-cli", "whisper-cpp", "main"]
+        for candidate in candidates:
+            found = shutil.which(candidate)
+            if found:
+                return found
+        raise EngineUnavailableError(
+            "whisper.cpp binary not found; install pywhispercpp or set WHISPER_CPP_BIN"
+        )
+
+    def load(self, model_size):
+        path = self.model_path(model_size)
+        if not os.path.exists(path):
+            raise EngineUnavailableError(
+                f"GGML model not found at {path}; download it with whisper.cpp's models/download-ggml-model.sh"
+            )
+        try:
+            # Bindings keep the model resident between calls
+            from pywhispercpp.model import Model
+        except ImportError:
+            return _WhisperCppCli(self._find_binary(), path)
+        return Model(path, n_threads=self.threads, print_progress=False, print_realtime=False)
+
+    def memory_mb(self, model):
+        # GGML weights are memory-mapped/loaded as-is, so the file size is a good estimate
+        path = getattr(model, "model_path", None)
+        return os.path.getsize(path) / (1024 * 1024) if path and os.path.exists(path) else 0
+
+    def transcribe(self, model, audio, language=None, initial_prompt=None, **options):
+        if isinstance(model, _WhisperCppCli):
+            segments, detected = self._transcribe_cli(model, audio, language, initial_prompt)
+        else:
+            segments, detected = self._transcribe_bindings(model, audio, language, initial_prompt)
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": detected or language,
+        }
+
+    def _transcribe_bindings(self, model, audio, language, initial_prompt):
+        params = {}
+        if language:
+            params["language"] = language
+        if initial_prompt:
+            params["initial_prompt"] = initial_prompt
+        raw_segments = model.transcribe(np.ascontiguousarray(audio, dtype=np.float32), **params)
+        # pywhispercpp reports times in 10 ms units
+        segments = [
+            _segment(index, raw.t0 / 100.0, raw.t1 / 100.0, raw.text)
+            for index, raw in enumerate(raw_segments)
+        ]
+        return segments, language
+
+    def _transcribe_cli(self, model, audio, language, initial_prompt):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            wav_path = os.path.join(temp_dir, "input.wav")
+            with open(wav_path, "wb") as f:
+                f.write(pcm_to_wav_bytes(audio))
+            output_base = os.path.join(temp_dir, "output")
+            command = [
+                model.binary,
+                "-m", model.model_path,
+                "-f", wav_path,
+                "-t", str(self.threads),
+                "-l", language or "auto",
+                "-oj",
+                "-of", output_base,
+                "-np",  # No progress prints
+            ]
+            if initial_prompt:
+                command += ["--prompt", initial_prompt]
+            process = subprocess.run(command, capture_output=True)
+            if process.returncode != 0:
+                raise RuntimeError(f"whisper.cpp failed: {process.stderr.decode(errors='replace').strip()}")
+            with open(output_base + ".json", encoding="utf-8") as f:
+                output = json.load(f)
+
+        segments = [
+            _segment(index, item["offsets"]["from"] / 1000.0, item["offsets"]["to"] / 1000.0, item["text"])
+            for index, item in enumerate(output.get("transcription", []))
+        ]
+        return segments, output.get("result", {}).get("language")
+
+
+def _segment(index, start, end, text):
+    """Builds a segment dict with the fields the UI and exporters use."""
+    return {"id": index, "seek": int(start * 100), "start": start, "end": end, "text": text}
+
+
+ENGINES = {
+    PyTorchWhisperEngine.name: PyTorchWhisperEngine(),
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine(),
+    WhisperCppEngine.name: WhisperCppEngine(),
+}
+DEFAULT_ENGINE = os.environ.get("STT_ENGINE", PyTorchWhisperEngine.name)
+
+
+def get_engine(name=None):
+    """Returns the engine registered under `name` (the default engine if None)."""
+    try:
+        return ENGINES[name or DEFAULT_ENGINE]
+    except KeyError:
+        raise ValueError(f"Unknown STT engine: {name}")
@@ -0,0 +1,579 @@
+"""Transcription helpers shared by the Streamlit pages and batch tools."""
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from audio_io import SAMPLE_RATE, decode_audio
+from metrics import stage_metrics
+from model_registry import DEFAULT_RAM_BUDGET_MB, get_model, registry, using_model
+from model_selector import rtf_tracker
+from result_cache import language_cache, result_cache
+from stt_engines import DEFAULT_ENGINE, get_engine
+from vad import remap_segments, remap_time, trim_silence
+
+# --- Long-audio settings ---
+# Chunks are sized so every core gets work, but never shorter/longer than these bounds
+MIN_CHUNK_SECONDS = 60
+MAX_CHUNK_SECONDS = 600
+# How far from the ideal cut point we look for the quietest moment
+SPLIT_SEARCH_SECONDS = 10
+# Audio shared between neighbouring chunks so words on the boundary are not lost
+CHUNK_OVERLAP_SECONDS = 1.0
+# Frame length for the energy scan used to find silence
+ENERGY_FRAME_SECONDS = 0.02
+# Most worker processes per long-audio pool; each holds its own copy of the model
+LONG_AUDIO_WORKERS = int(os.environ.get("STT_LONG_AUDIO_WORKERS", str(os.cpu_count() or 1)))
+# How often a long-audio decode reports progress (and lets a job check for cancellation)
+PROGRESS_SECONDS = 1.0
+# RAM for the models of all long-audio workers together (the in-process registry has its own budget)
+LONG_AUDIO_RAM_BUDGET_MB = int(os.environ.get("STT_LONG_AUDIO_RAM_BUDGET_MB", str(DEFAULT_RAM_BUDGET_MB)))
+
+# Whisper decodes 30-second windows; streaming hands results back at the same granularity
+STREAM_WINDOW_SECONDS = 30
+# Tail of the previous text passed as prompt so windows read as one transcript
+PROMPT_CHARS = 200
+
+
+def load_audio(source):
+    """Decodes an audio/video file path or raw bytes to 16 kHz mono float32 samples."""
+    return decode_audio(source)
+
+
+def transcribe(audio, model_size, engine=DEFAULT_ENGINE, vad=False, **decode_options):
+    """Transcribes a file path, raw file bytes or sample array with the shared model.
+
+    With `vad`, silence is collapsed before decoding and segment times are mapped back.
+    """
+    if not isinstance(audio, np.ndarray):
+        audio = load_audio(audio)
+    if vad:
+        return _transcribe_speech(audio, lambda speech: transcribe(speech, model_size, engine, **decode_options))
+    with using_model(model_size, engine) as model, stage_metrics.time("stt", "decode"):
+        return get_engine(engine).transcribe(model, audio, **decode_options)
+
+
+def _transcribe_speech(audio, transcribe_fn):
+    """Runs `transcribe_fn` on the audio without its silences and returns original-time segments."""
+    speech, remap = trim_silence(audio)
+    result = transcribe_fn(speech)
+    return dict(result, segments=remap_segments(result["segments"], remap))
+
+
+def iter_transcribe(audio, model_size, engine=DEFAULT_ENGINE, **decode_options):
+    """Decodes audio window by window, yielding new segments and progress after each one.
+
+    Each update is a dict with the new `segments` (global timestamps), `processed` and
+    `duration` in audio seconds, `elapsed` wall-clock seconds, `realtime_factor` and
+    the `language` used.
+    """
+    if not isinstance(audio, np.ndarray):
+        audio = load_audio(audio)
+    duration = len(audio) / SAMPLE_RATE
+    window = STREAM_WINDOW_SECONDS * SAMPLE_RATE
+    options = dict(decode_options)
+    prompt = options.pop("initial_prompt", None) or ""
+    start_time = time.perf_counter()
+    position = 0
+    segment_id = 0
+    stt_engine = get_engine(engine)
+
+    while position < len(audio):
+        is_last_window = position + window >= len(audio)
+        # The model lock is released between windows so other sessions can interleave
+        with using_model(model_size, engine) as model, stage_metrics.time("stt", "decode"):
+            result = stt_engine.transcribe(
+                model,
+                audio[position:position + window],
+                initial_prompt=prompt[-PROMPT_CHARS:] or None,
+                **options
+            )
+        # Detect the language once, then pin it for the remaining windows
+        if not options.get("language"):
+            options["language"] = result.get("language")
+
+        segments = result["segments"]
+        next_position = position + window
+        if not is_last_window and len(segments) > 1:
+            # The last segment may be cut off by the window edge; decode it again next time
+            cut = position + int(segments[-1]["start"] * SAMPLE_RATE)
+            if cut > position:
+                segments = segments[:-1]
+                next_position = cut
+
+        new_segments = []
+        for segment in segments:
+            segment = _shift_segment(segment, position / SAMPLE_RATE)
+            segment["id"] = segment_id
+            segment_id += 1
+            new_segments.append(segment)
+            prompt += segment["text"]
+
+        position = next_position
+        processed = min(position, len(audio)) / SAMPLE_RATE
+        elapsed = time.perf_counter() - start_time
+        yield {
+            "segments": new_segments,
+            "processed": processed,
+            "duration": duration,
+            "elapsed": elapsed,
+            "realtime_factor": elapsed / processed if processed else 0.0,
+            "language": options.get("language"),
+        }
+
+
+def detect_language(audio, model_size, engine=DEFAULT_ENGINE, audio_hash=None):
+    """Returns (language, detect_seconds, cached) for the first window of `audio`.
+
+    A language cached for `audio_hash` is returned without touching the model. Engines that
+    cannot detect on their own give None, and transcription then detects as usual.
+    """
+    if audio_hash:
+        language = language_cache.get(audio_hash)
+        if language:
+            return language, 0.0, True
+    start_time = time.perf_counter()
+    with using_model(model_size, engine) as model:
+        language = get_engine(engine).detect_language(model, audio[:STREAM_WINDOW_SECONDS * SAMPLE_RATE])
+    detect_seconds = time.perf_counter() - start_time
+    stage_metrics.observe("stt", "language detection", detect_seconds)
+    if language and audio_hash:
+        language_cache.put(audio_hash, language, detect_seconds)
+    return language, detect_seconds, False
+
+
+def _stream_into_job(job, audio, model_size, engine, segments, stage, remap=None, duration=None,
+                     **decode_options):
+    """Runs iter_transcribe, appending segments to `segments` and publishing progress on the job.
+
+    When `audio` had its silences removed, `remap` (from vad.trim_silence) and the original
+    `duration` put segment times and progress back on the original timeline.
+    """
+    language = None
+    for update in iter_transcribe(audio, model_size, engine, **decode_options):
+        new_segments = update["segments"]
+        processed = update["processed"]
+        progress = {"stage": stage, "model": model_size, "duration": update["duration"]}
+        if remap is not None:
+            new_segments = remap_segments(new_segments, remap)
+            processed = float(remap_time(processed, remap))
+            progress["duration"] = duration
+            progress["silence_removed"] = duration - update["duration"]
+        segments.extend(new_segments)
+        language = update["language"]
+        progress.update(
+            processed=processed,
+            elapsed=update["elapsed"],
+            # Against original audio time, so skipped silence counts as speed-up
+            realtime_factor=update["elapsed"] / processed if processed else 0.0,
+        )
+        job.progress = progress
+        job.check_cancelled()
+    return language
+
+
+def _prepare_job_audio(job, source, keep_audio, vad):
+    """Decodes a job's input and optionally trims silence; returns (audio, remap, duration).
+
+    Stage durations are recorded in `job.artifacts["timings"]`.
+    """
+    timings = job.artifacts["timings"] = {}
+    job.progress = {"stage": "decoding"}
+    start_time = time.perf_counter()
+    audio = source if isinstance(source, np.ndarray) else load_audio(source)
+    timings["decoding"] = time.perf_counter() - start_time
+    if keep_audio:
+        job.artifacts["audio"] = audio
+    job.check_cancelled()
+
+    duration = len(audio) / SAMPLE_RATE
+    remap = None
+    if vad:
+        job.progress = {"stage": "removing silence"}
+        start_time = time.perf_counter()
+        audio, remap = trim_silence(audio)
+        timings["silence removal"] = time.perf_counter() - start_time
+        stage_metrics.observe("stt", "silence removal", timings["silence removal"])
+    return audio, remap, duration
+
+
+def _job_language(job, audio, model_size, engine, language, audio_hash):
+    """Returns the language to pin for a job: the user's choice, a cached one or a fresh detection.
+
+    How it was obtained goes to `job.artifacts["language_source"]`.
+    """
+    if language:
+        job.artifacts["language_source"] = "selected"
+        return language
+    job.progress = {"stage": "detecting language"}
+    language, detect_seconds, cached = detect_language(audio, model_size, engine, audio_hash)
+    job.artifacts["timings"]["language detection"] = detect_seconds
+    if cached:
+        job.artifacts["language_source"] = "cached"
+    elif language:
+        job.artifacts["language_source"] = "detected"
+    else:
+        # The engine has no separate detection step; the first window detects it instead
+        job.artifacts["language_source"] = "transcription"
+    job.check_cancelled()
+    return language
+
+
+def _observe_speed(model_size, engine, audio_seconds, seconds, was_loaded):
+    """Feeds a finished decode into the realtime-factor profile used by automatic model selection."""
+    load_seconds = None
+    if not was_loaded:
+        # The first window also paid for loading the model; keep that apart
+        model_stats = registry.stats()["models"].get(f"{engine}:{model_size}")
+        if model_stats:
+            load_seconds = model_stats["load_seconds"]
+            seconds = max(seconds - load_seconds, 0.0)
+    rtf_tracker.observe(engine, model_size, audio_seconds, seconds, load_seconds)
+
+
+def _remember_language(job, audio_hash, language):
+    """Caches a language that was only found while transcribing."""
+    if audio_hash and language and job.artifacts.get("language_source") == "transcription":
+        language_cache.put(audio_hash, language)
+
+
+def run_transcription_job(job, source, model_size, engine=DEFAULT_ENGINE, long_audio=False,
+                          cache_key=None, keep_audio=False, vad=False, language=None, audio_hash=None):
+    """Job function for job_queue: decodes, transcribes with live progress and caches the result.
+
+    Segments are appended to `job.segments` as windows complete and the job stops at the
+    next window boundary once cancelled. With `vad`, silent stretches are skipped. Without
+    a `language`, the one cached for `audio_hash` is used or it is detected once up front.
+    """
+    audio, remap, duration = _prepare_job_audio(job, source, keep_audio, vad)
+    language = _job_language(job, audio, model_size, engine, language, audio_hash)
+    decode_options = {"language": language} if language else {}
+
+    was_loaded = registry.is_loaded(model_size, engine)
+    start_time = time.perf_counter()
+    if long_audio:
+        job.progress = {"stage": "transcribing", "duration": duration}
+        speech_duration = len(audio) / SAMPLE_RATE
+
+        def report(processed, elapsed):
+            # Chunks finish out of order, so progress is the finished share of the (speech) audio
+            processed = processed / speech_duration * duration if speech_duration else 0.0
+            progress = {"stage": "transcribing", "model": model_size, "duration": duration, "processed": processed,
+                        "elapsed": elapsed, "realtime_factor": elapsed / processed if processed else 0.0}
+            if remap is not None:
+                progress["silence_removed"] = duration - speech_duration
+            job.progress = progress
+            job.check_cancelled()
+
+        # Pinning the language also stops every chunk from detecting it separately
+        result = transcribe_long_audio(audio, model_size, engine=engine, on_progress=report, **decode_options)
+        if remap is not None:
+            result = dict(result, segments=remap_segments(result["segments"], remap))
+    else:
+        language = _stream_into_job(
+            job, audio, model_size, engine, job.segments, "transcribing", remap=remap, duration=duration,
+            **decode_options
+        )
+        result = {
+            "text": "".join(segment["text"] for segment in job.segments),
+            "segments": list(job.segments),
+            "language": language,
+        }
+    job.artifacts["timings"]["transcribing"] = time.perf_counter() - start_time
+    if not long_audio:
+        # Parallel chunked decoding is not comparable with the single-worker profile
+        _observe_speed(model_size, engine, len(audio) / SAMPLE_RATE, job.artifacts["timings"]["transcribing"],
+                       was_loaded)
+    _remember_language(job, audio_hash, result["language"])
+
+    if cache_key:
+        result_cache.put(cache_key, result)
+    return result
+
+
+def run_two_pass_job(job, source, model_size, draft_size="tiny", engine=DEFAULT_ENGINE,
+                     cache_key=None, keep_audio=False, vad=False, language=None, audio_hash=None):
+    """Job function for job_queue: a fast draft with `draft_size`, then a refine pass with `model_size`.
+
+    Draft segments go to `job.artifacts["draft_segments"]` and refined ones to `job.segments`,
+    so the page can show merge_two_pass() of both while the refine pass is running.
+    """
+    audio, remap, duration = _prepare_job_audio(job, source, keep_audio, vad)
+    # Detection runs on the small draft model; both passes then decode with the pinned language
+    language = _job_language(job, audio, draft_size, engine, language, audio_hash)
+    timings = job.artifacts["timings"]
+
+    draft_segments = job.artifacts["draft_segments"] = []
+    was_loaded = registry.is_loaded(draft_size, engine)
+    start_time = time.perf_counter()
+    language = _stream_into_job(
+        job, audio, draft_size, engine, draft_segments, "drafting", remap=remap, duration=duration,
+        language=language
+    )
+    timings["drafting"] = time.perf_counter() - start_time
+    _observe_speed(draft_size, engine, len(audio) / SAMPLE_RATE, timings["drafting"], was_loaded)
+    was_loaded = registry.is_loaded(model_size, engine)
+    start_time = time.perf_counter()
+    language = _stream_into_job(
+        job, audio, model_size, engine, job.segments, "refining", remap=remap, duration=duration,
+        language=language
+    )
+    timings["refining"] = time.perf_counter() - start_time
+    _observe_speed(model_size, engine, len(audio) / SAMPLE_RATE, timings["refining"], was_loaded)
+    _remember_language(job, audio_hash, language)
+
+    result = {
+        "text": "".join(segment["text"] for segment in job.segments),
+        "segments": list(job.segments),
+        "language": language,
+    }
+    if cache_key:
+        result_cache.put(cache_key, result)
+    return result
+
+
+def merge_two_pass(refined_segments, draft_segments):
+    """Refined segments where the refine pass has got to, draft segments after that.
+
+    Draft segments in the result are marked with "draft": True.
+    """
+    refined_until = refined_segments[-1]["end"] if refined_segments else 0.0
+    merged = list(refined_segments)
+    merged.extend(
+        dict(segment, draft=True) for segment in draft_segments if segment["start"] >= refined_until
+    )
+    return merged
+
+
+def find_split_points(audio, target_chunk_seconds):
+    """Returns sample offsets near every `target_chunk_seconds` that fall on the quietest frame."""
+    frame = int(ENERGY_FRAME_SECONDS * SAMPLE_RATE)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+    energy = np.square(audio[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+
+    target_frames = int(target_chunk_seconds / ENERGY_FRAME_SECONDS)
+    search_frames = int(SPLIT_SEARCH_SECONDS / ENERGY_FRAME_SECONDS)
+    points = []
+    position = target_frames
+    # Stop early enough that the last chunk is not a tiny tail
+    while position < n_frames - target_frames // 4:
+        lo = max(position - search_frames, 1)
+        hi = min(position + search_frames, n_frames - 1)
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        points.append(quietest * frame)
+        position = quietest + target_frames
+    return points
+
+
+def _shift_segment(segment, offset_seconds):
+    """Returns a copy of a Whisper segment moved by `offset_seconds`."""
+    shifted = dict(segment)
+    shifted["start"] = segment["start"] + offset_seconds
+    shifted["end"] = segment["end"] + offset_seconds
+    if "seek" in segment:
+        # seek is counted in 10 ms mel frames
+        shifted["seek"] = segment["seek"] + int(round(offset_seconds * 100))
+    if segment.get("words"):
+        shifted["words"] = [
+            dict(word, start=word["start"] + offset_seconds, end=word["end"] + offset_seconds)
+            for word in segment["words"]
+        ]
+    return shifted
+
+
+# --- Worker process side ---
+
+def limit_torch_threads(torch_threads):
+    """Limits intra-op threads so parallel workers do not oversubscribe the CPU."""
+    try:
+        import torch
+    except ImportError:
+        # whisper.cpp-only deployments have no torch to configure
+        return
+    torch.set_num_threads(torch_threads)
+
+
+def _transcribe_chunk(chunk, offset_seconds, model_size, engine, decode_options):
+    """Transcribes one chunk in a worker and returns its segments in global time."""
+    # Each worker process keeps its own registry, so the model stays warm between jobs
+    model = get_model(model_size, engine)
+    result = get_engine(engine).transcribe(model, chunk, **decode_options)
+    segments = [_shift_segment(segment, offset_seconds) for segment in result["segments"]]
+    return segments, result.get("language")
+
+
+class _ChunkPool:
+    """Worker processes that all decode with one model, so each worker holds exactly one copy."""
+
+    def __init__(self, model_size, engine, workers):
+        self.workers = workers
+        self.size_mb = workers * get_engine(engine).approx_size_mb(model_size)
+        # Jobs decoding on this pool; a pool in use is never shut down
+        self.users = 0
+        # spawn, not fork: forking a process that already runs torch threads can deadlock
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=limit_torch_threads,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+
+
+_pools = OrderedDict()
+_pools_changed = threading.Condition()
+
+
+def _pools_mb():
+    return sum(pool.size_mb for pool in _pools.values())
+
+
+@contextmanager
+def _chunk_pool(model_size, engine):
+    """Yields the worker pool for this model, created once and kept warm between jobs.
+
+    All pools together stay within LONG_AUDIO_RAM_BUDGET_MB: idle pools of other models are
+    shut down, least recently used first, to make room, and if the pools in use leave no
+    room this waits until they are released.
+    """
+    key = (engine, model_size)
+    with _pools_changed:
+        while key not in _pools:
+            workers = long_audio_workers(model_size, engine)
+            needed_mb = workers * get_engine(engine).approx_size_mb(model_size)
+            for other_key, other in list(_pools.items()):
+                if _pools_mb() + needed_mb <= LONG_AUDIO_RAM_BUDGET_MB:
+                    break
+                if not other.users:
+                    other.executor.shutdown(wait=False)
+                    del _pools[other_key]
+            # A model larger than the whole budget still gets one worker once nothing else runs
+            if _pools_mb() + needed_mb <= LONG_AUDIO_RAM_BUDGET_MB or not _pools:
+                _pools[key] = _ChunkPool(model_size, engine, workers)
+            else:
+                _pools_changed.wait()
+        pool = _pools[key]
+        _pools.move_to_end(key)
+        pool.users += 1
+    try:
+        yield pool
+    finally:
+        with _pools_changed:
+            pool.users -= 1
+            _pools_changed.notify_all()
+
+
+def long_audio_workers(model_size, engine=DEFAULT_ENGINE, workers=None):
+    """Chunk processes one long-audio job may use at once.
+
+    Bounded by LONG_AUDIO_WORKERS and by how many copies of the model fit in the RAM budget.
+    """
+    approx_mb = get_engine(engine).approx_size_mb(model_size)
+    fit = LONG_AUDIO_RAM_BUDGET_MB // approx_mb if approx_mb else LONG_AUDIO_WORKERS
+    return max(1, min(workers or LONG_AUDIO_WORKERS, LONG_AUDIO_WORKERS, fit))
+
+
+def _normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+def _stitch(chunk_results, bounds):
+    """Merges per-chunk segments, keeping each segment only in the chunk that owns its midpoint."""
+    segments = []
+    for (segments_in_chunk, _), (own_start, own_end) in zip(chunk_results, bounds):
+        # The overlap can make both chunks emit the same sentence around the cut, so segments
+        # starting near the cut are compared with the previous chunk's tail (not with each other)
+        previous_tail = {
+            _normalize_text(segment["text"]) for segment in segments
+            if segment["end"] >= own_start - CHUNK_OVERLAP_SECONDS
+        }
+        for segment in segments_in_chunk:
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if midpoint < own_start or midpoint >= own_end:
+                continue
+            if segment["start"] < own_start + CHUNK_OVERLAP_SECONDS and _normalize_text(segment["text"]) in previous_tail:
+                continue
+            segments.append(segment)
+
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+
+    languages = Counter(language for _, language in chunk_results if language)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else None,
+    }
+
+
+def transcribe_long_audio(audio, model_size, workers=None, engine=DEFAULT_ENGINE, vad=False, on_progress=None,
+                          **decode_options):
+    """Splits audio at silences and decodes the chunks in parallel worker processes.
+
+    Returns the same {"text", "segments", "language"} structure as `model.transcribe`,
+    with segment times relative to the start of the full recording. `on_progress(processed,
+    elapsed)` is called every PROGRESS_SECONDS with the audio seconds of finished chunks; if
+    it raises (e.g. JobCancelled), chunks not yet started are cancelled.
+    """
+    if not isinstance(audio, np.ndarray):
+        audio = load_audio(audio)
+    if vad:
+        return _transcribe_speech(
+            audio, lambda speech: transcribe_long_audio(speech, model_size, workers, engine, **decode_options)
+        )
+    duration = len(audio) / SAMPLE_RATE
+    workers = long_audio_workers(model_size, engine, workers)
+
+    target = min(max(duration / workers, MIN_CHUNK_SECONDS), MAX_CHUNK_SECONDS)
+    points = [0] + find_split_points(audio, target) + [len(audio)]
+    if len(points) == 2:
+        # Too short to be worth splitting
+        return transcribe(audio, model_size, engine, **decode_options)
+
+    overlap = int(CHUNK_OVERLAP_SECONDS * SAMPLE_RATE)
+    bounds = [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in zip(points[:-1], points[1:])]
+    # The first and last chunk own everything before/after them
+    bounds[0] = (float("-inf"), bounds[0][1])
+    bounds[-1] = (bounds[-1][0], float("inf"))
+
+    chunk_results = [None] * len(bounds)
+    pending = {}
+    next_chunk = 0
+    processed = 0.0
+    start_time = time.perf_counter()
+    # The workers' own timers stay in their processes; this is the wall-clock for all chunks
+    with _chunk_pool(model_size, engine) as pool, stage_metrics.time("stt", "parallel decode"):
+        try:
+            while next_chunk < len(bounds) or pending:
+                # Keep at most `workers` chunks of this job in the shared pool
+                while next_chunk < len(bounds) and len(pending) < workers:
+                    padded_start = max(points[next_chunk] - overlap, 0)
+                    padded_end = min(points[next_chunk + 1] + overlap, len(audio))
+                    future = pool.executor.submit(
+                        _transcribe_chunk,
+                        audio[padded_start:padded_end],
+                        padded_start / SAMPLE_RATE,
+                        model_size,
+                        engine,
+                        decode_options,
+                    )
+                    pending[future] = next_chunk
+                    next_chunk += 1
+                done, _ = wait(pending, timeout=PROGRESS_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    chunk_results[index] = future.result()
+                    processed += (points[index + 1] - points[index]) / SAMPLE_RATE
+                if on_progress:
+                    on_progress(processed, time.perf_counter() - start_time)
+        finally:
+            # Only reached with chunks pending when stopping early; running chunks finish on their own
+            for future in pending:
+                future.cancel()
+    return _stitch(chunk_results, bounds)
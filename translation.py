@@ -0,0 +1,184 @@
+"""Text translation for the TTS page, shared by every session in the process.
+
+One pooled requests.Session keeps connections to the translation endpoint open between
+calls. Text is split into sentences and each translated sentence is cached per target
+language, so re-translating an edited document only sends the sentences that changed.
+The sentences that are not cached are packed into batches small enough for the request
+URL, the batches are translated in parallel and the text is put back together in order.
+
+TRANSLATE_URL points the client at another endpoint, e.g. a local mock server in tests:
+
+    translator = Translator(url="http://127.0.0.1:8000/translate_a/single")
+    translator.translate("Hello. How are you?", "es")
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import stage_metrics
+from tts_cache import normalize_text
+from tts_service import split_sentences
+
+# The free endpoint used for demonstration; for production use the Cloud Translation API
+TRANSLATE_URL = os.environ.get("TRANSLATE_URL", "https://translate.googleapis.com/translate_a/single")
+# UTF-8 bytes of text per request; percent-encoding can triple that, which keeps URLs under ~4 KB
+MAX_BATCH_BYTES = int(os.environ.get("TRANSLATE_BATCH_BYTES", "1200"))
+# Parallel requests per translation, which is also the size of the connection pool
+TRANSLATE_WORKERS = int(os.environ.get("TRANSLATE_WORKERS", "4"))
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 15.0)
+# Transient failures retried by the session itself, with exponential backoff
+MAX_RETRIES = 3
+CACHE_ENTRIES = int(os.environ.get("TRANSLATE_CACHE_ENTRIES", "20000"))
+# Languages written without spaces between sentences
+NO_SPACE_LANGUAGES = {"ja", "zh", "th", "lo", "km", "my"}
+
+
+class TranslationError(RuntimeError):
+    """Raised when the endpoint rejects a request or returns something unexpected."""
+
+
+def create_session(pool_size=TRANSLATE_WORKERS, max_retries=MAX_RETRIES):
+    """Returns a Session whose connection pool fits `pool_size` parallel requests."""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def segment_text(text, max_bytes=MAX_BATCH_BYTES):
+    """Splits text into one list of sentences per paragraph.
+
+    Paragraphs are separated by blank lines; single line breaks (as left by PDF extraction)
+    are treated as spaces, so a sentence wrapped over several lines stays one sentence.
+    """
+    return [split_sentences(paragraph, max_bytes) for paragraph in re.split(r"\n\s*\n", text)]
+
+
+def make_batches(sentences, max_bytes=MAX_BATCH_BYTES):
+    """Packs sentences in order into batches whose newline-joined text fits in `max_bytes`."""
+    batches = []
+    size = 0
+    for sentence in sentences:
+        length = len(sentence.encode("utf-8")) + 1
+        if batches and size + length <= max_bytes + 1:
+            batches[-1].append(sentence)
+            size += length
+        else:
+            batches.append([sentence])
+            size = length
+    return batches
+
+
+class Translator:
+    """Translates text through a pooled session, in parallel batches, with a per-sentence LRU cache."""
+
+    def __init__(self, url=TRANSLATE_URL, max_batch_bytes=MAX_BATCH_BYTES, workers=TRANSLATE_WORKERS,
+                 timeout=REQUEST_TIMEOUT, cache_entries=CACHE_ENTRIES):
+        self.url = url
+        self.max_batch_bytes = max_batch_bytes
+        self.workers = workers
+        self.timeout = timeout
+        self.cache_entries = cache_entries
+        self.session = create_session(workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _request(self, text, target_language, source_language):
+        """Translates `text` with one request; line breaks in it come back in the translation."""
+        params = {"client": "gtx", "sl": source_language, "tl": target_language, "dt": "t", "q": text}
+        with stage_metrics.time("tts", "translation request"):
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+        with self._lock:
+            self.requests += 1
+        if response.status_code != 200:
+            raise TranslationError(f"Translation API Error: {response.status_code}")
+        try:
+            # [[["translated", "original", ...], ...], ...]: one entry per sentence
+            return "".join(sentence[0] for sentence in response.json()[0] if sentence[0])
+        except (ValueError, TypeError, IndexError) as e:
+            raise TranslationError(f"Unexpected translation response: {e}")
+
+    def _translate_batch(self, batch, target_language, source_language):
+        """Translates a batch of sentences sent as one line each; returns one translation per sentence."""
+        lines = self._request("\n".join(batch), target_language, source_language).strip().split("\n")
+        if len(lines) == len(batch):
+            return [line.strip() for line in lines]
+        # The endpoint merged or split lines, so the sentences cannot be matched up; send them one by one
+        return [self._request(sentence, target_language, source_language).strip() for sentence in batch]
+
+    def _cached(self, key):
+        with self._lock:
+            translated = self._cache.get(key)
+            if translated is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return translated
+
+    def _store(self, key, translated):
+        with self._lock:
+            self._cache[key] = translated
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def translate(self, text, target_language, source_language="auto"):
+        """Returns `text` translated to `target_language`, keeping its paragraphs.
+
+        Only sentences missing from the cache are sent, each distinct one once.
+        Raises TranslationError or a requests exception if any batch fails.
+        """
+        paragraphs = segment_text(text, self.max_batch_bytes)
+        translations = {}
+        for sentence in (sentence for paragraph in paragraphs for sentence in paragraph):
+            key = (normalize_text(sentence), target_language, source_language)
+            if key not in translations:
+                translations[key] = self._cached(key)
+
+        missing = [key for key, translated in translations.items() if translated is None]
+        batches = make_batches([key[0] for key in missing], self.max_batch_bytes)
+        results = self._pool.map(lambda batch: self._translate_batch(batch, target_language, source_language), batches)
+        for key, translated in zip(missing, (sentence for batch in results for sentence in batch)):
+            translations[key] = translated
+            self._store(key, translated)
+
+        separator = "" if target_language.split("-")[0].lower() in NO_SPACE_LANGUAGES else " "
+        return "\n\n".join(
+            separator.join(translations[(normalize_text(sentence), target_language, source_language)] for sentence in paragraph)
+            for paragraph in paragraphs
+        )
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._cache),
+            }
+
+
+# Shared by every session in the process
+translator = Translator()
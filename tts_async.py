@@ -0,0 +1,168 @@
+"""Asyncio layer in front of the Text-to-Speech API, shared by every session in the process.
+
+One event-loop thread owns one long-lived client, and with it one pool of gRPC channels.
+Synchronous code (Streamlit scripts, batch tools) hands coroutines to it with submit().
+A token bucket keeps the request rate under our quota, a semaphore bounds the requests
+in flight, and retryable errors are retried with jittered exponential backoff. Bursts
+from many users therefore queue up instead of failing.
+"""
+import asyncio
+import functools
+import inspect
+import itertools
+import os
+import random
+import threading
+import time
+
+from metrics import stage_metrics
+
+# Our Cloud TTS quota, and how many requests may go out back to back before the rate applies
+REQUESTS_PER_MINUTE = float(os.environ.get("TTS_REQUESTS_PER_MINUTE", "1000"))
+RATE_BURST = int(os.environ.get("TTS_RATE_BURST", "10"))
+# Requests waiting on the API at once, across all sessions
+MAX_IN_FLIGHT = int(os.environ.get("TTS_MAX_IN_FLIGHT", "8"))
+MAX_RETRIES = int(os.environ.get("TTS_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+# HTTP status codes worth retrying (google.api_core exceptions expose theirs as .code)
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        # Created on first use, on the loop that uses it
+        self._lock = None
+
+    async def acquire(self):
+        """Waits for a token and returns the seconds spent waiting (waiters are served in order)."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+def is_retryable(error):
+    """True for quota, overload and transient network errors."""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_CODES
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter, so clients that failed together do not retry together."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class AsyncTTSService:
+    """Runs synthesis requests on a private event loop with rate limiting, bounded concurrency and retries.
+
+    `client_factory` is called once, on the loop, to create the client. Its
+    synthesize_speech(request=...) may be a coroutine (TextToSpeechAsyncClient) or a plain
+    method (e.g. benchmark.FakeTTSClient), which then runs on the loop's thread pool.
+    """
+
+    def __init__(self, client_factory, requests_per_minute=REQUESTS_PER_MINUTE, burst=RATE_BURST,
+                 max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES, timeout=REQUEST_TIMEOUT_SECONDS):
+        self.client_factory = client_factory
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.timeout = timeout
+        # None or 0 turns rate limiting off
+        self._bucket = TokenBucket(requests_per_minute / 60, burst) if requests_per_minute else None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+        self.client = None
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    async def _create_client(self):
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self.client_factory()
+
+    def start(self):
+        """Starts the loop thread and creates the client, once; raises if the client cannot be created."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="tts-event-loop", daemon=True).start()
+            if self.client is None:
+                self.client = asyncio.run_coroutine_threadsafe(self._create_client(), self._loop).result()
+        return self
+
+    def submit(self, coroutine):
+        """Schedules a coroutine on the service loop and returns a concurrent.futures.Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _call(self, request):
+        method = self.client.synthesize_speech
+        if inspect.iscoroutinefunction(method):
+            return await method(request=request)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, request=request))
+
+    async def synthesize(self, request):
+        """Sends one request, waiting for a rate-limit token and an in-flight slot, retrying transient errors."""
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in itertools.count():
+                    if self._bucket is not None:
+                        waited = await self._bucket.acquire()
+                        if waited:
+                            stage_metrics.observe("tts", "rate limit wait", waited)
+                    self.requests += 1
+                    start_time = time.perf_counter()
+                    try:
+                        response = await asyncio.wait_for(self._call(request), self.timeout)
+                    except Exception as e:
+                        stage_metrics.observe("tts", "tts request", time.perf_counter() - start_time)
+                        if attempt >= self.max_retries or not is_retryable(e):
+                            self.failures += 1
+                            raise
+                        self.retries += 1
+                        delay = backoff_delay(attempt)
+                        stage_metrics.observe("tts", "backoff", delay)
+                        await asyncio.sleep(delay)
+                        continue
+                    stage_metrics.observe("tts", "tts request", time.perf_counter() - start_time)
+                    return response
+            finally:
+                self.in_flight -= 1
+
+    def close(self):
+        """Stops the loop thread (the shared service lives as long as the process and is never closed)."""
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+                self.client = None
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
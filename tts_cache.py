@@ -0,0 +1,169 @@
+"""Two-tier cache of synthesized speech shared by every session in the process.
+
+Recently used clips stay in an in-memory LRU; everything else lives in a size-bounded
+directory of MP3 files, so repeated requests survive restarts without an API call.
+"""
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "whisper_stt", "tts"),
+)
+DEFAULT_MAX_MB = int(os.environ.get("TTS_CACHE_MB", "256"))
+# The in-memory tier; a minute of 128 kbps MP3 is about 1 MB
+DEFAULT_MEMORY_MB = int(os.environ.get("TTS_MEMORY_CACHE_MB", "32"))
+
+
+def normalize_text(text):
+    """Canonical form of the input text: Unicode NFC with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(text, voice_name, language_code, speaking_rate, audio_encoding):
+    """Builds the cache key from everything that changes the synthesized audio."""
+    payload = json.dumps(
+        {
+            "text": normalize_text(text),
+            "voice": voice_name,
+            "language": language_code,
+            # 1 and 1.0 must not be different entries
+            "rate": round(float(speaking_rate), 3),
+            "encoding": audio_encoding,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    """In-memory LRU in front of an on-disk store that evicts least-recently-used files over budget."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_mb=DEFAULT_MAX_MB, memory_mb=DEFAULT_MEMORY_MB):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_mb * 1024 * 1024
+        self.memory_max_bytes = memory_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.cache_dir, key[:2], key + ".mp3")
+
+    def _entries(self):
+        """Returns (path, size, mtime) for every clip on disk."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".mp3"):
+                    path = os.path.join(root, name)
+                    try:
+                        info = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((path, info.st_size, info.st_mtime))
+        return entries
+
+    def _ensure_disk_total(self):
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._entries())
+
+    def _remember(self, key, audio):
+        """Adds a clip to the memory tier (caller holds the lock)."""
+        if len(audio) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key):
+        """Returns the cached audio bytes for `key`, or None."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        # Mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, key, audio):
+        """Stores a clip in both tiers, then trims the disk tier to its size limit."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        with self._lock:
+            self._ensure_disk_total()
+            if os.path.exists(path):
+                self._disk_bytes -= os.path.getsize(path)
+            os.replace(temp_path, path)
+            self._disk_bytes += len(audio)
+            self.stores += 1
+            self._remember(key, audio)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._disk_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._disk_bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        """Returns hit counters per tier, the overall hit rate and memory/disk usage."""
+        with self._lock:
+            self._ensure_disk_total()
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "memory_used_mb": round(self._memory_bytes / (1024 * 1024), 2),
+                "disk_used_mb": round(self._disk_bytes / (1024 * 1024), 2),
+                "max_mb": self.max_bytes // (1024 * 1024),
+            }
+
+
+# Shared by every session in the process
+synthesis_cache = SynthesisCache()
@@ -0,0 +1,225 @@
+"""Process-wide Google Cloud Text-to-Speech service shared by every session.
+
+Creating a client sets up credentials and a gRPC channel, which is slow, so one async
+client is created per process (or ahead of time by preload.py) and every request goes
+through the rate-limited, retrying tts_async.AsyncTTSService that owns it.
+synthesize() puts the shared synthesis cache in front of it, and synthesize_long()
+handles texts over the API's input limit.
+"""
+import asyncio
+import os
+import re
+import threading
+
+from tts_async import AsyncTTSService
+from tts_cache import make_key, synthesis_cache
+
+# Service account JSON next to the app; GOOGLE_APPLICATION_CREDENTIALS is used otherwise
+CREDENTIALS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "google_credentials.json")
+# texttospeech.AudioEncoding.MP3; the plain value keeps google.cloud out of code paths that use a fake client
+AUDIO_ENCODING = "MP3"
+_AUDIO_ENCODING_VALUES = {"LINEAR16": 1, "MP3": 2, "OGG_OPUS": 3}
+# The API rejects inputs larger than this many bytes (UTF-8)
+MAX_INPUT_BYTES = 5000
+# Size of the first chunk when streaming: a sentence or two, so playback starts quickly
+FIRST_CHUNK_BYTES = 300
+
+# Sentence ends: Latin punctuation followed by whitespace, or CJK full stops
+_SENTENCE_END = re.compile(r"(?<=[.!?;…])\s+|(?<=[。！？；])")
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def configure_credentials():
+    """Points the Google client libraries at the bundled credentials file, if there is one."""
+    if os.path.exists(CREDENTIALS_PATH):
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = CREDENTIALS_PATH
+
+
+def _create_async_client():
+    # Imported lazily so pages that never synthesize do not pay for the gRPC stack
+    from google.cloud import texttospeech
+
+    configure_credentials()
+    return texttospeech.TextToSpeechAsyncClient()
+
+
+def get_tts_service():
+    """Returns the shared AsyncTTSService; its client is created by start() or the first request."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AsyncTTSService(_create_async_client)
+        return _service
+
+
+def _request(text, voice_name, language_code, speaking_rate):
+    return {
+        "input": {"text": text},
+        "voice": {"language_code": language_code, "name": voice_name},
+        "audio_config": {
+            "audio_encoding": _AUDIO_ENCODING_VALUES[AUDIO_ENCODING],
+            "speaking_rate": speaking_rate,
+        },
+    }
+
+
+async def synthesize_async(text, voice_name, language_code, speaking_rate, service, cache=synthesis_cache):
+    """Coroutine for `service`'s loop: the cached audio for this exact request, or a fresh API call."""
+    key = make_key(text, voice_name, language_code, speaking_rate, AUDIO_ENCODING)
+    if cache is not None:
+        # Disk reads and writes stay off the event loop
+        audio = await asyncio.to_thread(cache.get, key)
+        if audio is not None:
+            return audio
+    response = await service.synthesize(_request(text, voice_name, language_code, speaking_rate))
+    if cache is not None:
+        await asyncio.to_thread(cache.put, key, response.audio_content)
+    return response.audio_content
+
+
+def synthesize(text, voice_name, language_code, speaking_rate=1.0, service=None, cache=synthesis_cache):
+    """Returns the audio bytes for `text`, calling the API only when the cache has no identical request.
+
+    `service` defaults to the shared one; an AsyncTTSService around a fake client
+    (such as benchmark.FakeTTSClient) works the same way.
+    """
+    service = service or get_tts_service()
+    return service.submit(synthesize_async(text, voice_name, language_code, speaking_rate, service, cache)).result()
+
+
+def _byte_length(text):
+    return len(text.encode("utf-8"))
+
+
+def _split_oversized(sentence, max_bytes):
+    """Splits one sentence that is over the limit at word boundaries, or mid-word as a last resort."""
+    pieces = []
+    current = ""
+    for word in sentence.split(" "):
+        while _byte_length(word) > max_bytes:
+            # A "word" this long (e.g. unspaced CJK text) is cut by characters
+            cut = len(word.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore"))
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:cut])
+            word = word[cut:]
+        candidate = f"{current} {word}" if current else word
+        if _byte_length(candidate) > max_bytes:
+            pieces.append(current)
+            candidate = word
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(text, max_bytes=MAX_INPUT_BYTES):
+    """Splits text into its sentences with whitespace collapsed; sentences over `max_bytes` are cut further."""
+    pieces = []
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        if sentence:
+            pieces.extend([sentence] if _byte_length(sentence) <= max_bytes else _split_oversized(sentence, max_bytes))
+    return pieces
+
+
+def split_chunks(text, max_bytes=MAX_INPUT_BYTES, first_max_bytes=None):
+    """Groups the sentences of `text` into chunks; returns one list of (starts_paragraph, sentence) per chunk.
+
+    Paragraphs are separated by blank lines; single line breaks (as left by PDF extraction)
+    are treated as spaces. Sentences are packed greedily while the chunk's text stays within
+    `max_bytes`, so short texts stay one chunk. With `first_max_bytes`, the first chunk holds
+    only the sentences that fit in that size, or just the first sentence when that alone is longer.
+    """
+    units = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        units.extend((index == 0, piece) for index, piece in enumerate(split_sentences(paragraph, max_bytes)))
+
+    chunks = []
+    current = []
+    size = 0
+    for starts_paragraph, unit in units:
+        limit = first_max_bytes if first_max_bytes and not chunks else max_bytes
+        # Sentences are joined with one character (space or line break)
+        length = _byte_length(unit) + (1 if current else 0)
+        # A first sentence over first_max_bytes becomes the first chunk on its own
+        if current and size + length > limit:
+            chunks.append(current)
+            current, size, length = [], 0, _byte_length(unit)
+        current.append((starts_paragraph, unit))
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_text(text, max_bytes=MAX_INPUT_BYTES, first_max_bytes=None):
+    """Splits text into chunks of at most `max_bytes`, cutting only between sentences where possible.
+
+    See split_chunks(); sentences that start a paragraph follow a line break.
+    """
+    return [
+        "".join((("\n" if starts_paragraph else " ") if index else "") + unit
+                for index, (starts_paragraph, unit) in enumerate(chunk))
+        for chunk in split_chunks(text, max_bytes, first_max_bytes)
+    ]
+
+
+def _strip_id3(audio, keep_header):
+    """Removes ID3 tags so MP3 streams can be joined frame to frame."""
+    if audio[-128:-125] == b"TAG":
+        audio = audio[:-128]
+    if not keep_header and audio[:3] == b"ID3":
+        # Tag size is a 28-bit "syncsafe" integer, plus the 10-byte header and an optional footer
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        audio = audio[10 + size + (10 if audio[5] & 0x10 else 0):]
+    return audio
+
+
+def join_mp3(parts):
+    """Concatenates MP3 clips into one stream without re-encoding."""
+    return b"".join(_strip_id3(part, keep_header=index == 0) for index, part in enumerate(parts))
+
+
+async def _synthesize_chunk_async(sentences, voice_name, language_code, speaking_rate, service, cache):
+    """Synthesizes and caches each sentence on its own, so a sentence reused in any text is a cache hit."""
+    parts = await asyncio.gather(*(
+        synthesize_async(sentence, voice_name, language_code, speaking_rate, service, cache) for sentence in sentences
+    ))
+    return join_mp3(parts)
+
+
+def iter_synthesize_long(text, voice_name, language_code, speaking_rate=1.0, service=None,
+                         cache=synthesis_cache, first_chunk_bytes=None):
+    """Synthesizes `text` chunk by chunk, yielding (index, count, audio) in order.
+
+    Chunks are the units of playback; within a chunk every sentence is a request (and
+    cache entry) of its own. All of them are handed to the service at once (it bounds how
+    many are in flight); each chunk is yielded as soon as it and all chunks before it are
+    done, so playback can start before the whole text is ready. A small `first_chunk_bytes`
+    (e.g. FIRST_CHUNK_BYTES) keeps that first wait short however long the text is.
+    """
+    chunks = split_chunks(text, first_max_bytes=first_chunk_bytes)
+    service = service or get_tts_service()
+    futures = [
+        service.submit(_synthesize_chunk_async(
+            [sentence for _, sentence in chunk], voice_name, language_code, speaking_rate, service, cache
+        ))
+        for chunk in chunks
+    ]
+    try:
+        for index, future in enumerate(futures):
+            yield index, len(chunks), future.result()
+    finally:
+        # On an error (or an abandoned generator) drop the chunks nobody will use
+        for future in futures:
+            future.cancel()
+
+
+def synthesize_long(text, voice_name, language_code, speaking_rate=1.0, service=None, cache=synthesis_cache):
+    """Returns MP3 bytes for text of any length; see iter_synthesize_long()."""
+    return join_mp3(
+        audio for _, _, audio in iter_synthesize_long(text, voice_name, language_code, speaking_rate, service, cache)
+    )
@@ -0,0 +1,124 @@
+"""Energy-based voice activity detection and silence trimming before decoding.
+
+Non-speech stretches are collapsed to a short pause, so Whisper only spends decode time
+on speech. A remap table converts timestamps in the trimmed audio back to the original.
+All the per-frame work is vectorized with NumPy.
+"""
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Analysis frame for the energy envelope
+FRAME_SECONDS = 0.03
+# Speech must be this far above the estimated noise floor
+THRESHOLD_ABOVE_FLOOR_DB = 12.0
+# ...and never quieter than this absolute level
+MIN_THRESHOLD_DB = -55.0
+# Speech regions are widened by this much so word onsets/tails are not clipped
+PADDING_SECONDS = 0.2
+# Silences shorter than this are kept as-is
+MIN_SILENCE_SECONDS = 0.6
+# Each removed silence is replaced by a pause of this length
+KEEP_GAP_SECONDS = 0.3
+
+
+def frame_energy_db(audio, frame_samples):
+    """Returns the RMS level of every full frame in dBFS."""
+    n_frames = len(audio) // frame_samples
+    frames = audio[:n_frames * frame_samples].reshape(n_frames, frame_samples)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _runs(mask):
+    """Returns (starts, ends) indices of the True runs in a boolean array."""
+    padded = np.concatenate([[False], mask, [False]])
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    return changes[0::2], changes[1::2]
+
+
+def _fill(length, starts, ends):
+    """Boolean array of `length` that is True inside every [start, end) interval."""
+    delta = np.zeros(length + 1, dtype=np.int32)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, ends, -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+def speech_mask(audio, sample_rate=SAMPLE_RATE):
+    """Returns a per-frame boolean mask of speech and the frame length in samples."""
+    frame_samples = int(FRAME_SECONDS * sample_rate)
+    energy = frame_energy_db(audio, frame_samples)
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool), frame_samples
+
+    # The quietest tenth of the recording approximates the noise floor
+    threshold = max(np.percentile(energy, 10) + THRESHOLD_ABOVE_FLOOR_DB, MIN_THRESHOLD_DB)
+    mask = energy > threshold
+
+    # Widen speech by the padding on both sides (a moving max via convolution)
+    pad = int(PADDING_SECONDS / FRAME_SECONDS)
+    if pad:
+        # mode="same" would return the kernel's length for clips shorter than it, so slice "full"
+        dilated = np.convolve(mask.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="full")
+        mask = dilated[pad:pad + len(mask)] > 0
+
+    # Close gaps that are too short to be worth removing
+    starts, ends = _runs(~mask)
+    short = (ends - starts) < int(MIN_SILENCE_SECONDS / FRAME_SECONDS)
+    mask |= _fill(len(mask), starts[short], ends[short])
+    return mask, frame_samples
+
+
+def trim_silence(audio, sample_rate=SAMPLE_RATE):
+    """Collapses non-speech regions and returns (trimmed_audio, remap).
+
+    `remap` is an (N, 3) array of kept intervals: [trimmed_start, original_start, length]
+    in seconds, used by remap_time()/remap_segments().
+    """
+    mask, frame_samples = speech_mask(audio, sample_rate)
+    if not mask.any():
+        # Nothing looks like speech; let the model decide rather than returning nothing
+        return audio, np.array([[0.0, 0.0, len(audio) / sample_rate]])
+
+    # Per-sample keep mask: speech plus the first KEEP_GAP_SECONDS of each silence
+    gap_frames = int(KEEP_GAP_SECONDS / FRAME_SECONDS)
+    starts, ends = _runs(~mask)
+    keep_frames = mask | _fill(len(mask), starts, np.minimum(starts + gap_frames, ends))
+    keep = np.repeat(keep_frames, frame_samples)
+    # Samples after the last full frame follow the last frame's decision
+    keep = np.concatenate([keep, np.full(len(audio) - len(keep), keep_frames[-1])])
+
+    kept_starts, kept_ends = _runs(keep)
+    lengths = kept_ends - kept_starts
+    trimmed_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    remap = np.stack([trimmed_starts, kept_starts, lengths], axis=1) / sample_rate
+    return audio[keep], remap
+
+
+def remap_time(seconds, remap):
+    """Maps times in the trimmed audio back to the original recording."""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    index = np.clip(np.searchsorted(remap[:, 0], seconds, side="right") - 1, 0, len(remap) - 1)
+    offset = np.clip(seconds - remap[index, 0], 0.0, remap[index, 2])
+    return remap[index, 1] + offset
+
+
+def remap_segments(segments, remap):
+    """Returns copies of segments (and their words) with original-audio timestamps."""
+    if not segments:
+        return []
+    starts = remap_time([segment["start"] for segment in segments], remap)
+    ends = remap_time([segment["end"] for segment in segments], remap)
+    remapped = []
+    for segment, start, end in zip(segments, starts, ends):
+        segment = dict(segment, start=float(start), end=float(end))
+        if segment.get("words"):
+            word_starts = remap_time([word["start"] for word in segment["words"]], remap)
+            word_ends = remap_time([word["end"] for word in segment["words"]], remap)
+            segment["words"] = [
+                dict(word, start=float(word_start), end=float(word_end))
+                for word, word_start, word_end in zip(segment["words"], word_starts, word_ends)
+            ]
+        remapped.append(segment)
+    return remapped